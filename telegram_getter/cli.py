@@ -8,9 +8,10 @@ from __future__ import annotations
 
 import asyncio
 import sys
+from collections.abc import AsyncIterator
 from datetime import datetime
 from pathlib import Path
-from typing import Annotated, Optional
+from typing import Annotated, Any, Optional
 
 import typer
 from rich.console import Console
@@ -55,7 +56,7 @@ Quick start:
 
 def _run_async(coro: object) -> object:
     """Run an async coroutine synchronously."""
-    return asyncio.get_event_loop().run_until_complete(coro)  # type: ignore[arg-type]
+    return asyncio.run(coro)  # type: ignore[arg-type]
 
 
 def _parse_date(date_str: str) -> datetime:
@@ -415,7 +416,7 @@ async def _download_async(
             media_downloader = MediaDownloader(
                 client=client, output_dir=chat_output_dir
             )
-            media_count = 0
+            messages_by_id = {msg.id: msg for msg in messages}
 
             with Progress(
                 SpinnerColumn(),
@@ -425,29 +426,28 @@ async def _download_async(
             ) as progress:
                 task = progress.add_task("Downloading media...", total=None)
 
+                done = 0
+
+                def on_downloaded(telegram_msg: Any, media_path: str) -> None:
+                    nonlocal done
+                    messages_by_id[telegram_msg.id].media_path = media_path
+                    done += 1
+                    progress.update(task, description=f"Downloaded {done} media files...")
+
                 # We need to get the original Telegram messages to download media
-                async for telegram_msg in client.iter_messages(
-                    target_chat["id"],
-                    offset_date=to_date,
-                ):
-                    if from_date and telegram_msg.date < from_date:
-                        continue
-
-                    if telegram_msg.media:
-                        # Find corresponding message in our list
-                        for msg in messages:
-                            if msg.id == telegram_msg.id:
-                                media_path = await media_downloader.download_media(
-                                    telegram_msg
-                                )
-                                if media_path:
-                                    msg.media_path = media_path
-                                    media_count += 1
-                                    progress.update(
-                                        task,
-                                        description=f"Downloaded {media_count} media files...",
-                                    )
-                                break
+                async def media_messages() -> AsyncIterator[Any]:
+                    async for telegram_msg in client.iter_messages(
+                        target_chat["id"],
+                        offset_date=to_date,
+                    ):
+                        if from_date and telegram_msg.date < from_date:
+                            continue
+                        if telegram_msg.media and telegram_msg.id in messages_by_id:
+                            yield telegram_msg
+
+                media_count = await media_downloader.download_all(
+                    media_messages(), on_downloaded=on_downloaded
+                )
 
             console.print(f"[green]Downloaded {media_count} media files[/green]")
 
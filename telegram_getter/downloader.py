@@ -14,12 +14,19 @@ Provides functionality to:
 from __future__ import annotations
 
 import asyncio
-from collections.abc import AsyncIterator, Callable
+import functools
+import inspect
+import time
+from collections import OrderedDict
+from collections.abc import AsyncGenerator, AsyncIterator, Awaitable, Callable, Mapping, Sequence
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, ClassVar, cast
 
+import aiofiles
+import orjson
 from telethon import TelegramClient
 from telethon.tl.types import Message as TelegramMessage
 
@@ -48,7 +55,7 @@ class ChatMessage:
     media_path: Path | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     """
     Represents a downloaded chat message with full metadata.
@@ -76,18 +83,23 @@ class Message:
     transcription: str | None = None
 
 
-def parse_message(telegram_msg: TelegramMessage) -> Message:
+def parse_message(
+    telegram_msg: TelegramMessage, sender_names: dict[int, str] | None = None
+) -> Message:
     """
     Convert a Telegram message object to our Message dataclass.
 
     Extracts all relevant fields from the Telegram message including:
-    - Basic fields: id, date, text
+    - Basic fields: id, date, text (Telethon dates are already UTC-aware
+      and are passed through unconverted)
     - Sender information: sender_id, sender_name (handles missing sender)
     - Reply context: reply_to message ID
     - Media type detection: photo, video, audio, document
 
     Args:
         telegram_msg: Telegram message object from Telethon
+        sender_names: Optional sender_id -> sender_name cache, so the name is
+            built once per sender rather than once per message
 
     Returns:
         Message dataclass with extracted data
@@ -100,9 +112,15 @@ def parse_message(telegram_msg: TelegramMessage) -> Message:
         sender_id = telegram_msg.sender_id
 
     if telegram_msg.sender is not None:
-        first_name = getattr(telegram_msg.sender, "first_name", None) or ""
-        last_name = getattr(telegram_msg.sender, "last_name", None) or ""
-        sender_name = f"{first_name} {last_name}".strip() or "Unknown"
+        cached = sender_names.get(sender_id) if sender_names is not None else None
+        if cached is not None:
+            sender_name = cached
+        else:
+            first_name = getattr(telegram_msg.sender, "first_name", None) or ""
+            last_name = getattr(telegram_msg.sender, "last_name", None) or ""
+            sender_name = f"{first_name} {last_name}".strip() or "Unknown"
+            if sender_names is not None and telegram_msg.sender_id is not None:
+                sender_names[sender_id] = sender_name
 
     # Extract text (default to empty string)
     text = telegram_msg.text or ""
@@ -134,8 +152,305 @@ def parse_message(telegram_msg: TelegramMessage) -> Message:
     )
 
 
-# Type alias for progress callback
-ProgressCallback = Callable[[int, int | None], None]
+# Type alias for progress callback (plain function or coroutine function)
+ProgressCallback = Callable[[int, int | None], Awaitable[None] | None]
+
+
+class _RecentIds:
+    """Bounded LRU set of message IDs, evicting the least recently seen."""
+
+    def __init__(self, maxsize: int) -> None:
+        self._maxsize = maxsize
+        self._ids: OrderedDict[int, None] = OrderedDict()
+
+    def check_and_add(self, msg_id: int) -> bool:
+        """Return True if msg_id was already present, recording it either way."""
+        if msg_id in self._ids:
+            self._ids.move_to_end(msg_id)
+            return True
+        self._ids[msg_id] = None
+        if len(self._ids) > self._maxsize:
+            self._ids.popitem(last=False)
+        return False
+
+
+async def _aclose(stream: AsyncIterator[Any]) -> None:
+    """Close an async generator; other async iterators are left alone."""
+    aclose = getattr(stream, "aclose", None)
+    if aclose is not None:
+        await aclose()
+
+
+# Marks the end of a prefetched stream
+_PREFETCH_DONE = object()
+
+
+async def _prefetch(source: AsyncIterator[Any], size: int) -> AsyncGenerator[Any, None]:
+    """
+    Read ahead from ``source`` in a background task, buffering up to ``size`` items.
+
+    Lets the client fetch the next page of messages while the consumer is
+    still working through the current one. Errors raised by ``source`` are
+    re-raised to the consumer once the buffered items ahead of them are read.
+    ``source`` is closed when the stream ends or is abandoned.
+    """
+    buffer: asyncio.Queue[Any] = asyncio.Queue(size)
+
+    async def fill() -> None:
+        try:
+            async for item in source:
+                await buffer.put(item)
+        except Exception:
+            # Wake the consumer, which re-raises by awaiting this task
+            await buffer.put(_PREFETCH_DONE)
+            raise
+        finally:
+            await _aclose(source)
+        await buffer.put(_PREFETCH_DONE)
+
+    filler = asyncio.create_task(fill())
+    try:
+        while (item := await buffer.get()) is not _PREFETCH_DONE:
+            yield item
+        await filler
+    finally:
+        filler.cancel()
+        await asyncio.wait([filler])
+        if not filler.cancelled():
+            filler.exception()  # consumed, so an abandoned error is not logged
+
+
+async def _raw_batches(
+    source: AsyncIterator[Any],
+    size: int,
+    from_date: datetime | None,
+    limit: int | None,
+    seen_ids: _RecentIds | None = None,
+) -> AsyncGenerator[list[Any], None]:
+    """
+    Group raw Telethon messages into lists of up to ``size`` items.
+
+    Messages older than ``from_date`` are skipped, as are repeats of an ID
+    still held in ``seen_ids``. No more than ``limit`` messages are taken
+    from ``source`` in total.
+    """
+    batch: list[Any] = []
+    if from_date is None and limit is None:
+        # No date filter or count to keep, so only the dedup check (if any)
+        # runs per message; this is the default download path
+        is_repeat = seen_ids.check_and_add if seen_ids is not None else None
+        async for telegram_msg in source:
+            if is_repeat is not None and is_repeat(telegram_msg.id):
+                continue
+            batch.append(telegram_msg)
+            if len(batch) >= size:
+                yield batch
+                batch = []
+    else:
+        taken = 0
+        async for telegram_msg in source:
+            # Filter by from_date if specified
+            if from_date is not None and telegram_msg.date < from_date:
+                continue
+
+            if seen_ids is not None and seen_ids.check_and_add(telegram_msg.id):
+                continue
+
+            batch.append(telegram_msg)
+            taken += 1
+
+            # Stop at the limit even if the client keeps producing messages
+            if limit is not None and taken >= limit:
+                break
+
+            if len(batch) >= size:
+                yield batch
+                batch = []
+
+    if batch:
+        yield batch
+
+
+@functools.lru_cache(maxsize=32)
+def _iter_kwargs(
+    to_date: datetime | None,
+    limit: int | None,
+    reverse: bool,
+    min_id: int | None,
+) -> Mapping[str, Any]:
+    """
+    Build the iter_messages keyword arguments for a download.
+
+    ``reverse`` and ``min_id`` are only passed when set, so the client's own
+    defaults apply otherwise. ``wait_time`` is always 0: Telethon otherwise
+    sleeps a second between pages on large downloads, on top of the
+    downloader's own delay_seconds. Results are cached and read-only, since
+    polling callers repeat the same options on every download.
+    """
+    kwargs: dict[str, Any] = {"offset_date": to_date, "limit": limit, "wait_time": 0}
+    if reverse:
+        kwargs["reverse"] = True
+    if min_id is not None:
+        kwargs["min_id"] = min_id
+    return MappingProxyType(kwargs)
+
+
+def _convert_batch(raw_batch: list[Any], sender_names: dict[int, str]) -> list[Message]:
+    """Parse a batch of raw Telethon messages in one tight loop."""
+    parse = parse_message
+    return [parse(telegram_msg, sender_names) for telegram_msg in raw_batch]
+
+
+def _total_from(task: asyncio.Task[Any]) -> int | None:
+    """Read the message total from a finished get_messages task, if it succeeded."""
+    # If we can't get total, continue without it
+    if task.cancelled() or task.exception() is not None:
+        return None
+    return getattr(task.result(), "total", None)
+
+
+class _ProgressPump:
+    """
+    Deliver progress updates to a callback from a background task.
+
+    Holds at most one pending update: a newer update replaces one that has
+    not been delivered yet, so the download loop never waits on the
+    callback. Coroutine callbacks are awaited; plain callbacks are called
+    on the event loop thread, as before, so they need not be thread-safe.
+    """
+
+    def __init__(self, callback: ProgressCallback) -> None:
+        self._callback = callback
+        # Classify once; the kind of callback cannot change mid-download
+        self._is_coroutine = inspect.iscoroutinefunction(callback)
+        self._pending: tuple[int, int | None] | None = None
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        self._task = asyncio.create_task(self._drain())
+
+    def offer(self, current: int, total: int | None) -> None:
+        """Queue an update, dropping any older one still waiting."""
+        self._pending = (current, total)
+        self._wakeup.set()
+
+    async def close(self) -> None:
+        """Wait until the last queued update has been delivered."""
+        self._closing = True
+        self._wakeup.set()
+        await self._task
+
+    def cancel(self) -> None:
+        """Stop delivering updates (no-op once closed)."""
+        self._task.cancel()
+
+    async def _drain(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            update, self._pending = self._pending, None
+            if update is not None:
+                if self._is_coroutine:
+                    await cast("Awaitable[None]", self._callback(*update))
+                else:
+                    self._callback(*update)
+            if self._closing and self._pending is None:
+                return
+
+
+class _DeliveryLog:
+    """
+    Record messages once the consumer has received them.
+
+    Appends them to the in-memory store and the JSONL sink and reports
+    progress, coalescing updates on large chats. Recording only delivered
+    messages keeps the stored data in step with what the consumer got,
+    even when it stops early. JSONL records are buffered and written in
+    chunks of about ``flush_bytes``, with the remainder written on close.
+    """
+
+    def __init__(
+        self,
+        store: list[Message] | None,
+        store_file: Any | None,
+        pump: _ProgressPump | None,
+        total_task: asyncio.Task[Any] | None,
+        min_delta: int,
+        min_interval_ms: int,
+        flush_bytes: int,
+    ) -> None:
+        self._store = store
+        self._store_file = store_file
+        # Encoded JSONL records waiting to be written in one go
+        self._pending = bytearray()
+        self._flush_bytes = flush_bytes
+        self._pump = pump
+        self._total_task = total_task
+        self._min_delta = min_delta
+        self._min_interval_ms = min_interval_ms
+        self.count = 0
+        self._total: int | None = None
+        self._last_emit: tuple[int, int | None] = (0, None)
+        self._last_emit_ts = time.monotonic()
+
+    async def record(self, messages: Sequence[Message]) -> None:
+        """Store, persist and count messages the consumer has received."""
+        if not messages:
+            return
+        if self._store is not None:
+            self._store.extend(messages)
+        if self._store_file is not None:
+            # Encoded like exporter.py; written out once enough has built up
+            dumps, option = orjson.dumps, orjson.OPT_APPEND_NEWLINE
+            for message in messages:
+                self._pending += dumps(message, option=option)
+            if len(self._pending) >= self._flush_bytes:
+                await self._flush()
+
+        if self._pump is None:
+            self.count += len(messages)
+            return
+        if self._total is None and self._total_task is not None and self._total_task.done():
+            self._total = _total_from(self._total_task)
+        for _ in messages:
+            self.count += 1
+            now = time.monotonic()
+            if (
+                self.count - self._last_emit[0] >= self._min_delta
+                or (now - self._last_emit_ts) * 1000 >= self._min_interval_ms
+            ):
+                self._pump.offer(self.count, self._total)
+                self._last_emit = (self.count, self._total)
+                self._last_emit_ts = now
+
+    async def _flush(self) -> None:
+        """Write out the buffered JSONL records."""
+        if self._store_file is not None and self._pending:
+            await self._store_file.write(bytes(self._pending))
+            self._pending.clear()
+
+    async def finish(self) -> None:
+        """Write out buffered records and deliver the final progress update."""
+        await self._flush()
+        if self._pump is None:
+            return
+        if self._total is None and self._total_task is not None:
+            await asyncio.wait([self._total_task])
+            self._total = _total_from(self._total_task)
+        if (self.count, self._total) != self._last_emit:
+            self._pump.offer(self.count, self._total)
+        await self._pump.close()
+
+    async def close(self) -> None:
+        """Stop background work, then flush and close the JSONL sink."""
+        if self._total_task is not None:
+            self._total_task.cancel()
+        if self._pump is not None:
+            self._pump.cancel()
+        if self._store_file is not None:
+            try:
+                await self._flush()
+            finally:
+                await self._store_file.close()
 
 
 @dataclass
@@ -162,12 +477,28 @@ class MessageDownloader:
         # Access all messages later
         for msg in downloader.messages:
             process(msg)
+
+    Or all at once, when no per-message processing is needed:
+        messages = await downloader.download_all("my_channel")
     """
 
+    # Progress callbacks fire at most once per this many messages or
+    # milliseconds, plus a final call with the true count
+    PROGRESS_MIN_DELTA: ClassVar[int] = 64
+    PROGRESS_MIN_INTERVAL_MS: ClassVar[int] = 100
+    # How many recent message IDs to remember when suppressing duplicates
+    DEDUP_CACHE_SIZE: ClassVar[int] = 5000
+    # store_path records are buffered and written out in chunks of about this size
+    STORE_FLUSH_BYTES: ClassVar[int] = 64 * 1024
+    # How many batches to read ahead of the consumer (0 disables prefetching)
+    PREFETCH_SIZE: ClassVar[int] = 2
+
     client: TelegramClient
     batch_size: int = 100
     delay_seconds: float = 0.5
     messages: list[Message] = field(default_factory=list)
+    # Display names by sender ID, shared across downloads
+    _sender_names: dict[int, str] = field(default_factory=dict, init=False, repr=False)
 
     async def download_messages(
         self,
@@ -180,6 +511,8 @@ class MessageDownloader:
         fetch_total: bool = False,
         reverse: bool = False,
         min_id: int | None = None,
+        dedup: bool = True,
+        store_path: Path | None = None,
     ) -> AsyncIterator[Message]:
         """
         Iterate through all messages in a chat.
@@ -192,73 +525,196 @@ class MessageDownloader:
             from_date: Only yield messages after this date
             to_date: Only yield messages before this date
             limit: Maximum number of messages to yield
-            progress_callback: Callback called with (current_count, total)
-            store: If True, store messages in self.messages
-            fetch_total: If True, fetch total message count before iterating
+            progress_callback: Callback called with (current_count, total); calls
+                are throttled, and the last one always carries the final count.
+                Plain functions are called on the event loop thread
+            store: If True, store messages in self.messages, a batch at a time once
+                the consumer has received it
+            fetch_total: If True, fetch the total message count alongside the first page
             reverse: If True, iterate from oldest to newest (chronological order)
             min_id: Minimum message ID to start from (use 0 for first message)
+            dedup: If True, skip messages whose ID was already yielded recently
+                (Telegram can repeat messages across pages around deletions)
+            store_path: If set, append each message to this file as a JSON line,
+                keeping memory flat on very large chats; lines are written in
+                chunks of about STORE_FLUSH_BYTES and in full once the stream ends
 
         Yields:
             Message objects from the chat
         """
-        total: int | None = None
-
-        # Fetch total count if requested
-        if fetch_total:
-            try:
-                result = await self.client.get_messages(chat, limit=0)
-                total = getattr(result, "total", None)
-            except Exception:
-                # If we can't get total, continue without it
-                pass
-
-        count = 0
-        batch_count = 0
-
-        # Build iter_messages kwargs
-        iter_kwargs: dict[str, Any] = {
-            "offset_date": to_date,
-            "limit": limit,
-        }
+        log = await self._open_delivery_log(
+            chat,
+            store=store,
+            store_path=store_path,
+            progress_callback=progress_callback,
+            fetch_total=fetch_total,
+        )
+        batches = self._download_batches(
+            chat,
+            from_date=from_date,
+            to_date=to_date,
+            limit=limit,
+            reverse=reverse,
+            min_id=min_id,
+            dedup=dedup,
+        )
+        batch: list[Message] = []
+        # Messages of the current batch handed to the consumer so far
+        sent = 0
+        try:
+            async for batch in batches:
+                for message in batch:
+                    sent += 1
+                    yield message
+                # Record a batch once the consumer has received all of it
+                if log is not None:
+                    await log.record(batch)
+                sent = 0
+            if log is not None:
+                await log.finish()
+        finally:
+            await batches.aclose()
+            if log is not None:
+                # A consumer that stopped mid-batch received only its first
+                # `sent` messages, so exactly those are recorded
+                if sent:
+                    await log.record(batch[:sent])
+                await log.close()
+
+    async def download_all(
+        self,
+        chat: str | int,
+        *,
+        store: bool = False,
+        store_path: Path | None = None,
+        progress_callback: ProgressCallback | None = None,
+        fetch_total: bool = False,
+        **options: Any,
+    ) -> list[Message]:
+        """
+        Download all matching messages from a chat into a list.
 
-        # Add reverse if True
-        if reverse:
-            iter_kwargs["reverse"] = True
+        Equivalent to collecting download_messages(), but messages are
+        gathered, stored and reported a batch at a time instead of passing
+        through the async generator one by one.
 
-        # Add min_id if specified
-        if min_id is not None:
-            iter_kwargs["min_id"] = min_id
+        Args:
+            chat: Chat username or ID to download from
+            store: If True, also store messages in self.messages
+            store_path: If set, append each message to this file as a JSON line
+            progress_callback: Callback called with (current_count, total)
+            fetch_total: If True, fetch the total message count alongside the first page
+            **options: Any other keyword argument accepted by download_messages()
 
-        async for telegram_msg in self.client.iter_messages(
+        Returns:
+            Messages from this download, in the order they were received
+        """
+        log = await self._open_delivery_log(
             chat,
-            **iter_kwargs,
-        ):
-            # Filter by from_date if specified
-            if from_date is not None and telegram_msg.date < from_date:
-                continue
-
-            message = parse_message(telegram_msg)
-            count += 1
+            store=store,
+            store_path=store_path,
+            progress_callback=progress_callback,
+            fetch_total=fetch_total,
+        )
+        messages: list[Message] = []
+        batches = self._download_batches(chat, **options)
+        try:
+            async for batch in batches:
+                if log is not None:
+                    await log.record(batch)
+                messages.extend(batch)
+            if log is not None:
+                await log.finish()
+        finally:
+            await batches.aclose()
+            if log is not None:
+                await log.close()
+        return messages
+
+    async def _open_delivery_log(
+        self,
+        chat: str | int,
+        *,
+        store: bool,
+        store_path: Path | None,
+        progress_callback: ProgressCallback | None,
+        fetch_total: bool,
+    ) -> _DeliveryLog | None:
+        """
+        Set up storage, the JSONL sink and progress reporting for one download.
 
-            # Store if requested
-            if store:
-                self.messages.append(message)
+        Returns None when there is nothing to store or report, so plain
+        downloads skip recording altogether; the total is not fetched then
+        either, since it only feeds progress updates.
+        """
+        if not store and store_path is None and progress_callback is None:
+            return None
 
-            # Call progress callback
-            if progress_callback is not None:
-                progress_callback(count, total)
+        # Open before starting any tasks so a bad path fails cleanly
+        store_file = await aiofiles.open(store_path, "ab") if store_path else None
 
-            yield message
+        # Fetch the total count alongside the first page instead of before it
+        total_task: asyncio.Task[Any] | None = None
+        if fetch_total:
+            total_task = asyncio.create_task(self.client.get_messages(chat, limit=0))
+
+        # Deliver progress from a background task, so the stream never waits
+        # for a coroutine callback to finish
+        pump = _ProgressPump(progress_callback) if progress_callback is not None else None
+
+        return _DeliveryLog(
+            self.messages if store else None,
+            store_file,
+            pump,
+            total_task,
+            self.PROGRESS_MIN_DELTA,
+            self.PROGRESS_MIN_INTERVAL_MS,
+            self.STORE_FLUSH_BYTES,
+        )
+
+    async def _download_batches(
+        self,
+        chat: str | int,
+        from_date: datetime | None = None,
+        to_date: datetime | None = None,
+        limit: int | None = None,
+        reverse: bool = False,
+        min_id: int | None = None,
+        dedup: bool = True,
+    ) -> AsyncGenerator[list[Message], None]:
+        """Yield parsed messages a batch at a time; see download_messages()."""
+        source = self.client.iter_messages(chat, **_iter_kwargs(to_date, limit, reverse, min_id))
+        batches = _raw_batches(
+            source,
+            size=max(self.batch_size, 1),
+            from_date=from_date,
+            limit=limit,
+            seen_ids=_RecentIds(self.DEDUP_CACHE_SIZE) if dedup else None,
+        )
+        # Read ahead whole batches, so the queue costs one hop per batch
+        prefetcher = _prefetch(batches, self.PREFETCH_SIZE) if self.PREFETCH_SIZE > 0 else None
 
-            # Add delay between batches for rate limiting
-            batch_count += 1
-            if batch_count >= self.batch_size:
-                batch_count = 0
-                await asyncio.sleep(self.delay_seconds)
+        count = 0
+        try:
+            async for raw_batch in prefetcher or batches:
+                batch = _convert_batch(raw_batch, self._sender_names)
+                yield batch
+                count += len(batch)
+
+                # Add delay between full batches for rate limiting
+                if len(raw_batch) >= self.batch_size and (limit is None or count < limit):
+                    await asyncio.sleep(self.delay_seconds)
+        finally:
+            # The prefetcher stops its reader before the streams are closed
+            if prefetcher is not None:
+                await prefetcher.aclose()
+            await batches.aclose()
+            await _aclose(source)
 
     def clear_messages(self) -> None:
-        """Clear all stored messages."""
+        """Clear all stored messages and cached sender names."""
         self.messages.clear()
+        self._sender_names.clear()
 
 
 # Legacy function-based API for backwards compatibility
@@ -11,19 +11,37 @@ Provides functionality to:
 
 from __future__ import annotations
 
+import asyncio
 import json
+import operator
 from collections import defaultdict
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
 
 import aiofiles
+import orjson
 
 from telegram_getter.downloader import ChatMessage, Message
 
 if TYPE_CHECKING:
     from collections.abc import Sequence
 
+# Sort key for chronological order; attrgetter avoids a Python-level call per item
+_BY_DATE = operator.attrgetter("date")
+
+# orjson options for the JSON documents we write: two-space indent plus a
+# trailing newline; the chunk fragments spliced into messages.json omit it
+_JSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE
+_JSON_FRAGMENT_OPTIONS = orjson.OPT_INDENT_2
+
+# Exports with more messages than this are encoded and written one chunk at a
+# time, so the encoded JSON never has to sit in memory all at once
+_JSON_CHUNK_SIZE = 5000
+
+# Message fields that are usually None; omit_none exports leave them out
+_OPTIONAL_MESSAGE_FIELDS = ("reply_to", "media_type", "media_path", "transcription")
+
 
 async def load_existing_messages(output_dir: Path) -> tuple[list[dict[str, Any]], int]:
     """
@@ -199,7 +217,7 @@ async def export_to_markdown(
         lines.append("")
 
         # Sort messages by time (oldest first within the day)
-        day_messages = sorted(messages_by_date[date_key], key=lambda m: m.date)
+        day_messages = sorted(messages_by_date[date_key], key=_BY_DATE)
 
         for msg in day_messages:
             lines.append(format_message(msg))
@@ -280,7 +298,7 @@ async def generate_metadata(
         "chat_name": chat_name,
         "chat_id": chat_id,
         "chat_type": chat_type,
-        "downloaded_at": datetime.now(UTC).isoformat(),
+        "downloaded_at": datetime.now(UTC),
         "total_messages": len(messages),
         "media_files": media_counts,
         "date_range": {
@@ -289,8 +307,9 @@ async def generate_metadata(
         },
     }
 
-    async with aiofiles.open(output_path, "w", encoding="utf-8") as f:
-        await f.write(json.dumps(metadata, indent=2, ensure_ascii=False))
+    # Encode the whole document up front so it reaches the file in one write
+    async with aiofiles.open(output_path, "wb") as f:
+        await f.write(orjson.dumps(metadata, option=_JSON_OPTIONS))
 
     return output_path
 
@@ -298,6 +317,8 @@ async def generate_metadata(
 async def export_messages_to_json(
     messages: Sequence[Message],
     output_dir: Path,
+    *,
+    omit_none: bool = False,
 ) -> Path:
     """
     Export all messages to a JSON file in chronological order.
@@ -310,6 +331,9 @@ async def export_messages_to_json(
     Args:
         messages: List of Message objects to export
         output_dir: Directory where the file will be created
+        omit_none: Leave out optional fields (reply_to, media_type,
+            media_path, transcription) that are None, shrinking the file;
+            dict_to_message reads them back as None
 
     Returns:
         Path to the created JSON file
@@ -317,33 +341,76 @@ async def export_messages_to_json(
     output_dir.mkdir(parents=True, exist_ok=True)
     output_path = output_dir / "messages.json"
 
-    # Sort messages by date (oldest first for chronological order)
-    sorted_messages = sorted(messages, key=lambda m: m.date)
+    # Sorting and encoding are CPU-bound; keep them off the event loop so
+    # concurrent downloads keep running during large exports
+    await asyncio.to_thread(_write_messages_json, messages, output_path, omit_none)
 
-    def message_to_dict(msg: Message) -> dict[str, Any]:
-        """Convert Message to dictionary for JSON serialization."""
-        return {
-            "id": msg.id,
-            "date": msg.date.isoformat(),
-            "sender_id": msg.sender_id,
-            "sender_name": msg.sender_name,
-            "text": msg.text,
-            "reply_to": msg.reply_to,
-            "media_type": msg.media_type,
-            "media_path": msg.media_path,
-            "transcription": msg.transcription,
-        }
+    return output_path
 
-    data = {
-        "exported_at": datetime.now(UTC).isoformat(),
-        "message_count": len(messages),
-        "messages": [message_to_dict(msg) for msg in sorted_messages],
+
+def _compact_message(msg: Message) -> dict[str, Any]:
+    """Return msg as a dict without the optional fields that are None."""
+    record: dict[str, Any] = {
+        "id": msg.id,
+        "date": msg.date,
+        "sender_id": msg.sender_id,
+        "sender_name": msg.sender_name,
+        "text": msg.text,
     }
+    for name in _OPTIONAL_MESSAGE_FIELDS:
+        value = getattr(msg, name)
+        if value is not None:
+            record[name] = value
+    return record
 
-    async with aiofiles.open(output_path, "w", encoding="utf-8") as f:
-        await f.write(json.dumps(data, indent=2, ensure_ascii=False))
 
-    return output_path
+def _json_records(messages: list[Message], omit_none: bool) -> list[Any]:
+    """Return what orjson should encode for messages: the dataclasses or compact dicts."""
+    if omit_none:
+        return [_compact_message(msg) for msg in messages]
+    return messages
+
+
+def _write_messages_json(
+    messages: Sequence[Message], output_path: Path, omit_none: bool = False
+) -> None:
+    """Sort, encode and write messages.json; runs in a worker thread."""
+    # Sort messages by date (oldest first for chronological order)
+    sorted_messages = sorted(messages, key=_BY_DATE)
+
+    header = {
+        "exported_at": datetime.now(UTC),
+        "message_count": len(messages),
+    }
+
+    # orjson serializes the Message dataclasses field by field, in declaration
+    # order, and formats datetimes as ISO 8601, which dict_to_message reads back
+    if len(sorted_messages) <= _JSON_CHUNK_SIZE:
+        # Encode the whole document up front so it reaches the file in one write
+        output_path.write_bytes(
+            orjson.dumps(
+                {**header, "messages": _json_records(sorted_messages, omit_none)},
+                option=_JSON_OPTIONS,
+            )
+        )
+        return
+
+    # Stream large exports chunk by chunk, splicing each encoded chunk into
+    # the same indented layout the single write above produces. Raw newlines
+    # only appear as orjson's own formatting (strings escape them), so
+    # re-indenting by replacing them is safe.
+    with output_path.open("wb") as f:
+        # Drop the closing "\n}" of the header object to append the list
+        f.write(orjson.dumps(header, option=_JSON_FRAGMENT_OPTIONS)[:-2])
+        f.write(b',\n  "messages": [\n')
+        for start in range(0, len(sorted_messages), _JSON_CHUNK_SIZE):
+            chunk = _json_records(sorted_messages[start : start + _JSON_CHUNK_SIZE], omit_none)
+            encoded = orjson.dumps(chunk, option=_JSON_FRAGMENT_OPTIONS)
+            if start:
+                f.write(b",\n")
+            # Strip the list's "[\n" and "\n]" and indent the items one level
+            f.write(b"  " + encoded[2:-2].replace(b"\n", b"\n  "))
+        f.write(b"\n  ]\n}\n")
 
 
 class ChatExporter:
@@ -11,10 +11,12 @@ Provides functionality to:
 
 from __future__ import annotations
 
+import asyncio
 from collections import defaultdict
+from collections.abc import AsyncIterable, Callable
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, ClassVar
 
 from telethon import TelegramClient
 
@@ -135,6 +137,7 @@ class MediaDownloader:
     - Tracking sequence numbers per date
     - Skipping existing files
     - Progress callback support
+    - Bounded concurrent downloads via download_all()
 
     Usage:
         downloader = MediaDownloader(client=client, output_dir=Path("output/chat"))
@@ -143,6 +146,9 @@ class MediaDownloader:
             print(f"Downloaded to: {path}")
     """
 
+    # Default number of media files fetched at once by download_all()
+    MAX_CONCURRENT_DOWNLOADS: ClassVar[int] = 4
+
     client: TelegramClient
     output_dir: Path
     _sequence_counters: dict[tuple[str, str], int] = field(
@@ -205,3 +211,47 @@ class MediaDownloader:
             return None
 
         return relative_path
+
+    async def download_all(
+        self,
+        messages: AsyncIterable[Any],
+        on_downloaded: Callable[[Any, str], None] | None = None,
+        concurrency: int | None = None,
+    ) -> int:
+        """
+        Download media from a stream of messages, several files at a time.
+
+        At most ``concurrency`` downloads are in flight; the stream is not
+        read further until a slot frees up. Filenames are assigned in stream
+        order, so sequence numbers match a one-at-a-time download.
+
+        Args:
+            messages: Telegram message objects with media attribute
+            on_downloaded: Optional callback receiving (message, relative_path)
+                for each file that was downloaded
+            concurrency: Maximum simultaneous downloads
+                (default MAX_CONCURRENT_DOWNLOADS)
+
+        Returns:
+            Number of media files downloaded
+        """
+        slots = asyncio.Semaphore(max(concurrency or self.MAX_CONCURRENT_DOWNLOADS, 1))
+        downloaded = 0
+
+        async def fetch(message: Any) -> None:
+            nonlocal downloaded
+            try:
+                path = await self.download_media(message)
+            finally:
+                slots.release()
+            if path:
+                downloaded += 1
+                if on_downloaded is not None:
+                    on_downloaded(message, path)
+
+        async with asyncio.TaskGroup() as group:
+            async for message in messages:
+                await slots.acquire()
+                group.create_task(fetch(message))
+
+        return downloaded
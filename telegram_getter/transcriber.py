@@ -8,6 +8,7 @@ built-in transcription API. Requires Telegram Premium or limited free uses.
 from __future__ import annotations
 
 import asyncio
+import math
 from typing import TYPE_CHECKING
 
 from telethon import functions
@@ -15,6 +16,9 @@ from telethon import functions
 if TYPE_CHECKING:
     from telethon import TelegramClient
 
+# Seconds between status checks while a transcription is pending
+_POLL_INTERVAL = 2
+
 
 async def transcribe_voice_message(
     client: TelegramClient,
@@ -30,7 +34,7 @@ async def transcribe_voice_message(
     transcription quota.
 
     If the transcription is initially pending, the function will poll
-    every 2 seconds until completion or timeout.
+    every 2 seconds, giving up after max_wait seconds' worth of polls.
 
     Args:
         client: Authenticated TelegramClient
@@ -55,6 +59,47 @@ async def transcribe_voice_message(
         ...         print("Transcription not available")
     """
     try:
+        return await _transcribe_and_wait(client, peer, msg_id, max_wait)
+    except Exception:
+        # Transcription not available (no Premium, quota exceeded, timeout, etc.)
+        return None
+
+
+async def _transcribe_and_wait(
+    client: TelegramClient,
+    peer: int | str,
+    msg_id: int,
+    max_wait: int,
+) -> str | None:
+    """
+    Request a transcription and poll until it is no longer pending.
+
+    At most max_wait / 2 polls are made, the last one right after the final
+    wait. Counting polls rather than timing them keeps slow requests from
+    eating into the wait, and ends the loop even when the clock does not
+    advance.
+
+    Args:
+        client: Authenticated TelegramClient
+        peer: Chat ID (int) or username (str) containing the voice message
+        msg_id: Message ID to transcribe
+        max_wait: Maximum seconds to wait for transcription
+
+    Returns:
+        Transcription text, or None if the result has no (or empty) text
+    """
+    result = await client(
+        functions.messages.TranscribeAudioRequest(
+            peer=peer,
+            msg_id=msg_id,
+        )
+    )
+
+    # If pending, re-fetch transcription status until complete
+    for _ in range(math.ceil(max_wait / _POLL_INTERVAL)):
+        if not result.pending:
+            break
+        await asyncio.sleep(_POLL_INTERVAL)
         result = await client(
             functions.messages.TranscribeAudioRequest(
                 peer=peer,
@@ -62,20 +107,5 @@ async def transcribe_voice_message(
             )
         )
 
-        # If pending, wait for completion
-        wait_time = 0
-        while getattr(result, "pending", False) and wait_time < max_wait:
-            await asyncio.sleep(2)
-            wait_time += 2
-            # Re-fetch transcription status
-            result = await client(
-                functions.messages.TranscribeAudioRequest(
-                    peer=peer,
-                    msg_id=msg_id,
-                )
-            )
-
-        return getattr(result, "text", None)
-    except Exception:
-        # Transcription not available (no Premium, quota exceeded, etc.)
-        return None
+    # Empty text is treated the same as no transcription
+    return getattr(result, "text", None) or None
@@ -0,0 +1,43 @@
+"""
+Shared pytest fixtures for telegram_getter tests.
+"""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pytest_mock import MockerFixture
+
+from tests.helpers import StubClient
+
+
+@pytest.fixture
+def stub_client() -> StubClient:
+    """Provide a fresh StubClient for each test."""
+    return StubClient()
+
+
+@pytest.fixture
+def env_credentials(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Set valid API_ID and API_HASH environment variables for the test."""
+    monkeypatch.setenv("API_ID", "12345")
+    monkeypatch.setenv("API_HASH", "abc123hash")
+
+
+@pytest.fixture(autouse=True)
+def mock_sleep(request: pytest.FixtureRequest, mocker: MockerFixture) -> AsyncMock | None:
+    """
+    Make asyncio.sleep and time.sleep return immediately.
+
+    Rate-limit delays and retry backoffs would otherwise stall tests on
+    real wall-clock waits. Tests marked with ``real_sleep`` opt out and
+    get None; everyone else can request this fixture to assert on the
+    awaited asyncio.sleep calls.
+    """
+    if request.node.get_closest_marker("real_sleep") is not None:
+        return None
+
+    sleep = mocker.patch("asyncio.sleep", new=AsyncMock(return_value=None))
+    mocker.patch("time.sleep", new=MagicMock(return_value=None))
+    return sleep
@@ -0,0 +1,62 @@
+"""
+Shared test helpers for telegram_getter tests.
+"""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator, Iterable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+async def aiter_items(items: Iterable[T] = ()) -> AsyncIterator[T]:
+    """Yield items as an async stream, like client.iter_messages()."""
+    for item in items:
+        yield item
+
+
+class StubClient:
+    """
+    Minimal stand-in for TelegramClient.
+
+    Provides explicit coroutines for the client methods the auth flow
+    awaits, recording calls in plain counters instead of building a
+    MagicMock tree per test.
+    """
+
+    __slots__ = (
+        "authorized",
+        "disconnect_calls",
+        "me",
+        "start_calls",
+        "start_error",
+        "start_kwargs",
+    )
+
+    def __init__(self) -> None:
+        self.authorized = True
+        self.me: Any = None
+        self.start_error: BaseException | None = None
+        self.start_calls = 0
+        self.start_kwargs: dict[str, Any] = {}
+        self.disconnect_calls = 0
+
+    async def start(self, **kwargs: Any) -> None:
+        """Record the start call, raising start_error if one is set."""
+        self.start_calls += 1
+        self.start_kwargs = kwargs
+        if self.start_error is not None:
+            raise self.start_error
+
+    async def disconnect(self) -> None:
+        """Record the disconnect call."""
+        self.disconnect_calls += 1
+
+    async def is_user_authorized(self) -> bool:
+        """Return the configured authorization status."""
+        return self.authorized
+
+    async def get_me(self) -> Any:
+        """Return the configured current user."""
+        return self.me
@@ -10,16 +10,100 @@ These tests verify:
 """
 
 import os
+from collections.abc import Callable, Coroutine, Iterator
 from pathlib import Path
-from unittest.mock import AsyncMock, MagicMock, patch
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import MagicMock
 
-from typer.testing import CliRunner
+import pytest
+from pytest_mock import MockerFixture
+from telethon import TelegramClient
+from typer.testing import CliRunner, Result
 
 from telegram_getter.cli import app
+from tests.helpers import aiter_items
 
 runner = CliRunner()
 
 
+@pytest.fixture(scope="module", autouse=True)
+def _creds() -> Iterator[None]:
+    """Set valid API credentials once for every test in this module."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("API_ID", "12345")
+        mp.setenv("API_HASH", "abc123hash")
+        yield
+
+
+@pytest.fixture(scope="session")
+def download_help() -> Result:
+    """Run `download --help` once and share the result across tests."""
+    return runner.invoke(app, ["download", "--help"])
+
+
+@pytest.fixture(scope="session")
+def list_help() -> Result:
+    """Run `list --help` once and share the result across tests."""
+    return runner.invoke(app, ["list", "--help"])
+
+
+async def _anone(*_args: Any, **_kwargs: Any) -> None:
+    """Coroutine stub returning None, cheaper to await than an AsyncMock."""
+
+
+def _aret(value: Any) -> Callable[..., Coroutine[Any, Any, Any]]:
+    """Build a coroutine stub that always returns ``value``."""
+
+    async def _stub(*_args: Any, **_kwargs: Any) -> Any:
+        return value
+
+    return _stub
+
+
+class Chat(SimpleNamespace):
+    """Lightweight stand-in for a Telethon Chat entity (matched by class name)."""
+
+
+@pytest.fixture
+def mock_client() -> MagicMock:
+    """
+    Provide a freshly wired mock Telegram client for each test.
+
+    The mock is created here rather than shared, so no test sees another's
+    changes; ``spec_set`` makes a typo in a client method name fail loudly
+    instead of yielding a child mock.
+    """
+    mock_entity = Chat(id=12345, title="Test Chat", unread_count=0)
+    mock_dialog = SimpleNamespace(name="Test Chat", entity=mock_entity, unread_count=0)
+
+    client = MagicMock(spec_set=TelegramClient)
+    client.start = _anone
+    client.disconnect = _anone
+    client.get_dialogs = _aret([mock_dialog])
+    client.get_entity = _aret(mock_entity)
+    client.iter_messages = MagicMock(side_effect=lambda *_args, **_kwargs: aiter_items())
+    return client
+
+
+@pytest.fixture
+def invoke_cli(mocker: MockerFixture, mock_client: MagicMock) -> Callable[[list[str]], Result]:
+    """Return a CLI invoker with TelegramClient patched to return mock_client."""
+    mocker.patch("telegram_getter.auth.TelegramClient", return_value=mock_client)
+    return lambda args: runner.invoke(app, args)
+
+
+@pytest.fixture(scope="class")
+def shared_tmp(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """
+    Output directory shared by every test in a class.
+
+    The mocked chat has no messages, so each run only rewrites the same
+    empty export files; tests never read them back.
+    """
+    return tmp_path_factory.mktemp("cli")
+
+
 class TestCLIHelp:
     """Test CLI help output shows all commands."""
 
@@ -59,57 +143,53 @@ class TestAuthCommand:
         assert result.exit_code == 0
         assert "auth" in result.output.lower() or "Authenticate" in result.output
 
-    def test_auth_command_shows_success_message(self) -> None:
+    def test_auth_command_shows_success_message(
+        self, mock_client: MagicMock, invoke_cli: Callable[[list[str]], Result]
+    ) -> None:
         """
         GIVEN valid credentials and mock client
         WHEN running auth command
         THEN shows success message with username
         """
-        with patch.dict(os.environ, {"API_ID": "12345", "API_HASH": "abc123hash"}):
-            mock_user = MagicMock()
-            mock_user.username = "testuser"
-            mock_user.first_name = "Test"
-
-            mock_client = MagicMock()
-            mock_client.start = AsyncMock()
-            mock_client.disconnect = AsyncMock()
-            mock_client.get_me = AsyncMock(return_value=mock_user)
-            mock_client.is_user_authorized = AsyncMock(return_value=True)
-
-            with patch("telegram_getter.auth.TelegramClient", return_value=mock_client):
-                result = runner.invoke(app, ["auth"])
-                assert result.exit_code == 0
-                # Should show success message
-                output_lower = result.output.lower()
-                assert "success" in output_lower or "authenticated" in output_lower or "logged in" in output_lower
-
-    def test_auth_command_handles_missing_credentials(self) -> None:
+        mock_user = SimpleNamespace(username="testuser", first_name="Test")
+        mock_client.get_me = _aret(mock_user)
+
+        result = invoke_cli(["auth"])
+        assert result.exit_code == 0
+        # Should show success message
+        output_lower = result.output.lower()
+        assert "success" in output_lower or "authenticated" in output_lower or "logged in" in output_lower
+
+    @pytest.mark.parametrize("argv", [["auth"], ["download", "SomeChat"]], ids=["auth", "download"])
+    def test_command_handles_missing_credentials(
+        self, mocker: MockerFixture, argv: list[str]
+    ) -> None:
         """
         GIVEN no API credentials in environment
-        WHEN running auth command
+        WHEN running a command that needs a Telegram client
         THEN shows error message about missing credentials
         """
-        with patch.dict(os.environ, {}, clear=True):
-            result = runner.invoke(app, ["auth"])
-            assert result.exit_code != 0
-            output_lower = result.output.lower()
-            assert "error" in output_lower or "missing" in output_lower or "api" in output_lower
+        mocker.patch.dict(os.environ, {}, clear=True)
+        result = runner.invoke(app, argv)
+        assert result.exit_code != 0
+        output_lower = result.output.lower()
+        assert "error" in output_lower or "missing" in output_lower or "api" in output_lower
 
 
 class TestDownloadCommand:
     """Test download command."""
 
-    def test_download_command_exists(self) -> None:
+    def test_download_command_exists(self, download_help: Result) -> None:
         """
         GIVEN CLI app
         WHEN running download --help
-        THEN command is recognized and shows help
+        THEN command is recognized and shows help including the chat argument
         """
-        result = runner.invoke(app, ["download", "--help"])
-        assert result.exit_code == 0
+        assert download_help.exit_code == 0
         # Should show download help
-        output_lower = result.output.lower()
+        output_lower = download_help.output.lower()
         assert "download" in output_lower
+        assert "chat" in output_lower
 
     def test_download_command_requires_chat_or_id(self) -> None:
         """
@@ -117,355 +197,127 @@ class TestDownloadCommand:
         WHEN running download without chat or --id
         THEN shows error about missing argument
         """
-        with patch.dict(os.environ, {"API_ID": "12345", "API_HASH": "abc123hash"}):
-            result = runner.invoke(app, ["download"])
-            # Should fail with missing argument
-            assert result.exit_code != 0 or "missing" in result.output.lower() or "required" in result.output.lower()
-
-    def test_download_command_accepts_chat_name(self) -> None:
-        """
-        GIVEN CLI app with valid setup
-        WHEN running download with chat name
-        THEN command accepts the argument
-        """
-        result = runner.invoke(app, ["download", "--help"])
-        assert result.exit_code == 0
-        # Help should mention chat argument
-        assert "chat" in result.output.lower() or "CHAT" in result.output
-
-    def test_download_command_has_id_option(self) -> None:
-        """
-        GIVEN CLI app
-        WHEN running download --help
-        THEN shows --chat-id option for downloading by ID
-        """
-        result = runner.invoke(app, ["download", "--help"])
-        assert result.exit_code == 0
-        # Typer converts chat_id to --chat-id
-        assert "--chat-id" in result.output
-
-    def test_download_command_has_output_option(self) -> None:
-        """
-        GIVEN CLI app
-        WHEN running download --help
-        THEN shows --output/-o option
-        """
-        result = runner.invoke(app, ["download", "--help"])
-        assert result.exit_code == 0
-        assert "--output" in result.output or "-o" in result.output
-
-    def test_download_command_has_from_date_option(self) -> None:
-        """
-        GIVEN CLI app
-        WHEN running download --help
-        THEN shows --from-date option for date filtering
-        """
-        result = runner.invoke(app, ["download", "--help"])
-        assert result.exit_code == 0
-        assert "--from" in result.output or "--from-date" in result.output
+        result = runner.invoke(app, ["download"])
+        # Should fail with missing argument
+        assert result.exit_code != 0 or "missing" in result.output.lower() or "required" in result.output.lower()
 
-    def test_download_command_has_to_date_option(self) -> None:
+    @pytest.mark.parametrize(
+        "option", ["--id", "--output", "--from", "--to", "--no-media", "--all", "--transcribe"]
+    )
+    def test_download_command_has_option(self, download_help: Result, option: str) -> None:
         """
         GIVEN CLI app
         WHEN running download --help
-        THEN shows --to-date option for date filtering
+        THEN shows each supported download option
         """
-        result = runner.invoke(app, ["download", "--help"])
-        assert result.exit_code == 0
-        assert "--to" in result.output or "--to-date" in result.output
-
-    def test_download_command_has_no_media_flag(self) -> None:
-        """
-        GIVEN CLI app
-        WHEN running download --help
-        THEN shows --no-media flag
-        """
-        result = runner.invoke(app, ["download", "--help"])
-        assert result.exit_code == 0
-        assert "--no-media" in result.output
-
-    def test_download_command_has_all_flag(self) -> None:
-        """
-        GIVEN CLI app
-        WHEN running download --help
-        THEN shows --download-all flag for downloading all messages chronologically
-        """
-        result = runner.invoke(app, ["download", "--help"])
-        assert result.exit_code == 0
-        assert "--download-all" in result.output
-
-    def test_download_command_has_transcribe_flag(self) -> None:
-        """
-        GIVEN CLI app
-        WHEN running download --help
-        THEN shows --transcribe/-t flag for voice message transcription
-        """
-        result = runner.invoke(app, ["download", "--help"])
-        assert result.exit_code == 0
-        assert "--transcribe" in result.output
+        assert option in download_help.output
 
 
 class TestDownloadCommandExecution:
     """Test download command execution with mocked Telegram client."""
 
-    def test_download_by_chat_name(self, tmp_path: Path) -> None:
+    def test_download_by_chat_name(
+        self, shared_tmp: Path, invoke_cli: Callable[[list[str]], Result]
+    ) -> None:
         """
         GIVEN valid credentials and chat name
-        WHEN running download with --chat option
+        WHEN running download with the chat name argument
         THEN downloads messages to output directory
         """
-        with patch.dict(os.environ, {"API_ID": "12345", "API_HASH": "abc123hash"}):
-            # Mock Telegram client
-            mock_client = MagicMock()
-            mock_client.start = AsyncMock()
-            mock_client.disconnect = AsyncMock()
-            mock_client.is_user_authorized = AsyncMock(return_value=True)
-
-            # Mock get_dialogs to return a chat
-            mock_entity = MagicMock()
-            mock_entity.id = 12345
-            mock_entity.__class__.__name__ = "Chat"
-            mock_entity.unread_count = 0
-
-            mock_dialog = MagicMock()
-            mock_dialog.name = "Test Chat"
-            mock_dialog.entity = mock_entity
-            mock_dialog.unread_count = 0
-
-            mock_client.get_dialogs = AsyncMock(return_value=[mock_dialog])
-            mock_client.get_entity = AsyncMock(return_value=mock_entity)
-
-            # Mock iter_messages to return empty (no messages)
-            mock_client.iter_messages = MagicMock()
-            mock_client.iter_messages.return_value = AsyncIteratorMock([])
-
-            with patch("telegram_getter.auth.TelegramClient", return_value=mock_client):
-                result = runner.invoke(
-                    app,
-                    ["download", "--chat", "Test Chat", "--output", str(tmp_path)],
-                )
-                # Command should complete (even with no messages)
-                # We're mainly testing that the command is recognized
-                # Check that the command is recognized and arguments are accepted
-                assert "no such option" not in result.output.lower()
-                assert "unexpected" not in result.output.lower()
-
-    def test_download_by_chat_id(self, tmp_path: Path) -> None:
+        result = invoke_cli(["download", "Test Chat", "--output", str(shared_tmp)])
+        # Command should complete (even with no messages)
+        # We're mainly testing that the command is recognized
+        # Check that the command is recognized and arguments are accepted
+        assert "no such option" not in result.output.lower()
+        assert "unexpected" not in result.output.lower()
+
+    def test_download_by_chat_id(
+        self, shared_tmp: Path, invoke_cli: Callable[[list[str]], Result]
+    ) -> None:
         """
         GIVEN valid credentials and chat ID
-        WHEN running download --chat-id 12345
+        WHEN running download --id 12345
         THEN downloads messages to output directory
         """
-        with patch.dict(os.environ, {"API_ID": "12345", "API_HASH": "abc123hash"}):
-            mock_client = MagicMock()
-            mock_client.start = AsyncMock()
-            mock_client.disconnect = AsyncMock()
-            mock_client.is_user_authorized = AsyncMock(return_value=True)
-
-            # Mock get_entity to return a chat
-            mock_entity = MagicMock()
-            mock_entity.id = 12345
-            mock_entity.__class__.__name__ = "Chat"
-            mock_entity.title = "Test Chat"
-
-            mock_client.get_entity = AsyncMock(return_value=mock_entity)
-
-            # Mock get_dialogs
-            mock_dialog = MagicMock()
-            mock_dialog.name = "Test Chat"
-            mock_dialog.entity = mock_entity
-            mock_dialog.unread_count = 0
-            mock_client.get_dialogs = AsyncMock(return_value=[mock_dialog])
-
-            # Mock iter_messages
-            mock_client.iter_messages = MagicMock()
-            mock_client.iter_messages.return_value = AsyncIteratorMock([])
-
-            with patch("telegram_getter.auth.TelegramClient", return_value=mock_client):
-                result = runner.invoke(
-                    app,
-                    ["download", "--chat-id", "12345", "--output", str(tmp_path)],
-                )
-                # Command should accept --chat-id option
-                # Should not have "no such option" error
-                assert "no such option" not in result.output.lower()
-                assert "unexpected" not in result.output.lower()
-
-    def test_download_with_date_range(self, tmp_path: Path) -> None:
+        result = invoke_cli(["download", "--id", "12345", "--output", str(shared_tmp)])
+        # Command should accept --id option
+        # Should not have "no such option" error
+        assert "no such option" not in result.output.lower()
+        assert "unexpected" not in result.output.lower()
+
+    def test_download_with_date_range(
+        self, shared_tmp: Path, invoke_cli: Callable[[list[str]], Result]
+    ) -> None:
         """
         GIVEN valid credentials and date range
-        WHEN running download with --from-date and --to-date options
+        WHEN running download with --from and --to options
         THEN filters messages by date
         """
-        with patch.dict(os.environ, {"API_ID": "12345", "API_HASH": "abc123hash"}):
-            mock_client = MagicMock()
-            mock_client.start = AsyncMock()
-            mock_client.disconnect = AsyncMock()
-            mock_client.is_user_authorized = AsyncMock(return_value=True)
-
-            mock_entity = MagicMock()
-            mock_entity.id = 12345
-            mock_entity.__class__.__name__ = "Chat"
-            mock_entity.unread_count = 0
-
-            mock_dialog = MagicMock()
-            mock_dialog.name = "Test Chat"
-            mock_dialog.entity = mock_entity
-            mock_dialog.unread_count = 0
-
-            mock_client.get_dialogs = AsyncMock(return_value=[mock_dialog])
-            mock_client.get_entity = AsyncMock(return_value=mock_entity)
-            mock_client.iter_messages = MagicMock()
-            mock_client.iter_messages.return_value = AsyncIteratorMock([])
-
-            with patch("telegram_getter.auth.TelegramClient", return_value=mock_client):
-                result = runner.invoke(
-                    app,
-                    [
-                        "download",
-                        "--chat",
-                        "Test Chat",
-                        "--output",
-                        str(tmp_path),
-                        "--from-date",
-                        "2025-01-01",
-                        "--to-date",
-                        "2025-01-31",
-                    ],
-                )
-                # Should accept date options
-                assert "no such option" not in result.output.lower()
-
-    def test_download_with_no_media_flag(self, tmp_path: Path) -> None:
+        result = invoke_cli(
+            [
+                "download",
+                "Test Chat",
+                "--output",
+                str(shared_tmp),
+                "--from",
+                "2025-01-01",
+                "--to",
+                "2025-01-31",
+            ],
+        )
+        # Should accept date options
+        assert "no such option" not in result.output.lower()
+
+    def test_download_with_no_media_flag(
+        self, shared_tmp: Path, invoke_cli: Callable[[list[str]], Result]
+    ) -> None:
         """
         GIVEN valid credentials
         WHEN running download with --no-media flag
         THEN skips media download
         """
-        with patch.dict(os.environ, {"API_ID": "12345", "API_HASH": "abc123hash"}):
-            mock_client = MagicMock()
-            mock_client.start = AsyncMock()
-            mock_client.disconnect = AsyncMock()
-            mock_client.is_user_authorized = AsyncMock(return_value=True)
-
-            mock_entity = MagicMock()
-            mock_entity.id = 12345
-            mock_entity.__class__.__name__ = "Chat"
-            mock_entity.unread_count = 0
-
-            mock_dialog = MagicMock()
-            mock_dialog.name = "Test Chat"
-            mock_dialog.entity = mock_entity
-            mock_dialog.unread_count = 0
-
-            mock_client.get_dialogs = AsyncMock(return_value=[mock_dialog])
-            mock_client.get_entity = AsyncMock(return_value=mock_entity)
-            mock_client.iter_messages = MagicMock()
-            mock_client.iter_messages.return_value = AsyncIteratorMock([])
-
-            with patch("telegram_getter.auth.TelegramClient", return_value=mock_client):
-                result = runner.invoke(
-                    app,
-                    ["download", "--chat", "Test Chat", "--output", str(tmp_path), "--no-media"],
-                )
-                # Should accept --no-media flag
-                assert "unknown" not in result.output.lower()
-                assert "no such option" not in result.output.lower()
+        result = invoke_cli(["download", "Test Chat", "--output", str(shared_tmp), "--no-media"])
+        # Should accept --no-media flag
+        assert "unknown" not in result.output.lower()
+        assert "no such option" not in result.output.lower()
 
 
 class TestDownloadCommandErrors:
     """Test download command error handling."""
 
-    def test_download_handles_chat_not_found(self) -> None:
+    def test_download_handles_chat_not_found(
+        self, mock_client: MagicMock, invoke_cli: Callable[[list[str]], Result]
+    ) -> None:
         """
         GIVEN valid credentials but non-existent chat
         WHEN running download with unknown chat name
         THEN shows error message about chat not found
         """
-        with patch.dict(os.environ, {"API_ID": "12345", "API_HASH": "abc123hash"}):
-            mock_client = MagicMock()
-            mock_client.start = AsyncMock()
-            mock_client.disconnect = AsyncMock()
-            mock_client.is_user_authorized = AsyncMock(return_value=True)
-            mock_client.get_dialogs = AsyncMock(return_value=[])  # No chats
-
-            with patch("telegram_getter.auth.TelegramClient", return_value=mock_client):
-                result = runner.invoke(app, ["download", "--chat", "NonExistentChat"])
-                # Should show error about chat not found
-                output_lower = result.output.lower()
-                assert result.exit_code != 0 or "not found" in output_lower or "error" in output_lower
-
-    def test_download_handles_authentication_error(self) -> None:
-        """
-        GIVEN missing credentials
-        WHEN running download command
-        THEN shows authentication error
-        """
-        with patch.dict(os.environ, {}, clear=True):
-            result = runner.invoke(app, ["download", "--chat", "SomeChat"])
-            assert result.exit_code != 0
-            output_lower = result.output.lower()
-            assert "error" in output_lower or "authentication" in output_lower or "api" in output_lower
+        mock_client.get_dialogs = _aret([])  # No chats
+
+        result = invoke_cli(["download", "NonExistentChat"])
+        # Should show error about chat not found
+        output_lower = result.output.lower()
+        assert result.exit_code != 0 or "not found" in output_lower or "error" in output_lower
 
 
 class TestListCommand:
     """Test existing list command still works."""
 
-    def test_list_command_exists(self) -> None:
+    def test_list_command_exists(self, list_help: Result) -> None:
         """
         GIVEN CLI app
         WHEN running list --help
         THEN command is recognized
         """
-        result = runner.invoke(app, ["list", "--help"])
-        assert result.exit_code == 0
-        assert "list" in result.output.lower()
-
-    def test_list_command_has_groups_option(self) -> None:
-        """
-        GIVEN CLI app
-        WHEN running list --help
-        THEN shows --groups option
-        """
-        result = runner.invoke(app, ["list", "--help"])
-        assert result.exit_code == 0
-        assert "--groups" in result.output
-
-    def test_list_command_has_private_option(self) -> None:
-        """
-        GIVEN CLI app
-        WHEN running list --help
-        THEN shows --private option
-        """
-        result = runner.invoke(app, ["list", "--help"])
-        assert result.exit_code == 0
-        assert "--private" in result.output
+        assert list_help.exit_code == 0
+        assert "list" in list_help.output.lower()
 
-    def test_list_command_has_channels_option(self) -> None:
+    @pytest.mark.parametrize("option", ["--groups", "--private", "--channels"])
+    def test_list_command_has_option(self, list_help: Result, option: str) -> None:
         """
         GIVEN CLI app
         WHEN running list --help
-        THEN shows --channels option
+        THEN shows each chat type filter option
         """
-        result = runner.invoke(app, ["list", "--help"])
-        assert result.exit_code == 0
-        assert "--channels" in result.output
-
-
-# Helper class for mocking async iterators
-class AsyncIteratorMock:
-    """Mock async iterator for testing."""
-
-    def __init__(self, items: list) -> None:
-        self.items = items
-        self.index = 0
-
-    def __aiter__(self):
-        return self
-
-    async def __anext__(self):
-        if self.index >= len(self.items):
-            raise StopAsyncIteration
-        item = self.items[self.index]
-        self.index += 1
-        return item
+        assert option in list_help.output
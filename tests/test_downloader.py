@@ -11,9 +11,19 @@ These tests verify:
 """
 
 import asyncio
+import json
+import threading
+import time
+from collections.abc import AsyncIterator, Callable, Iterable
+from contextlib import aclosing
+from dataclasses import dataclass
 from datetime import UTC, datetime
-from unittest.mock import AsyncMock, MagicMock
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, call
 
+import aiofiles
 import pytest
 
 from telegram_getter.downloader import (
@@ -21,229 +31,154 @@ from telegram_getter.downloader import (
     MessageDownloader,
     parse_message,
 )
+from telegram_getter.exporter import dict_to_message
+from tests.helpers import aiter_items
 
+# Filler timestamp for tests that do not care about the message date
+FIXED_DATE = datetime(2024, 1, 1, tzinfo=UTC)
 
-class TestMessageDataclass:
-    """Test Message dataclass structure and fields."""
+# Stand-in for an attached media object; parse_message only checks it against None
+_PRESENT = object()
 
-    def test_message_has_required_id_field(self) -> None:
-        """
-        GIVEN Message dataclass
-        WHEN creating an instance
-        THEN id field is required and stored correctly
-        """
-        msg = Message(
-            id=12345,
-            date=datetime.now(UTC),
-            sender_id=1001,
-            sender_name="Test User",
-            text="Hello world",
-        )
-        assert msg.id == 12345
 
-    def test_message_has_required_date_field(self) -> None:
-        """
-        GIVEN Message dataclass
-        WHEN creating an instance
-        THEN date field is required and stored correctly
-        """
-        now = datetime.now(UTC)
-        msg = Message(
-            id=1,
-            date=now,
-            sender_id=1001,
-            sender_name="Test",
-            text="Hello",
-        )
-        assert msg.date == now
+@dataclass(frozen=True, slots=True)
+class _FakeSender:
+    """Telethon sender stand-in with the name fields parse_message reads."""
 
-    def test_message_has_required_sender_id_field(self) -> None:
-        """
-        GIVEN Message dataclass
-        WHEN creating an instance
-        THEN sender_id field is required and stored correctly
-        """
-        msg = Message(
-            id=1,
-            date=datetime.now(UTC),
-            sender_id=999888777,
-            sender_name="Test",
-            text="Hello",
-        )
-        assert msg.sender_id == 999888777
+    first_name: str | None = "Test"
+    last_name: str | None = None
 
-    def test_message_has_required_sender_name_field(self) -> None:
-        """
-        GIVEN Message dataclass
-        WHEN creating an instance
-        THEN sender_name field is required and stored correctly
-        """
-        msg = Message(
-            id=1,
-            date=datetime.now(UTC),
-            sender_id=1001,
-            sender_name="John Doe",
-            text="Hello",
-        )
-        assert msg.sender_name == "John Doe"
 
-    def test_message_has_required_text_field(self) -> None:
-        """
-        GIVEN Message dataclass
-        WHEN creating an instance
-        THEN text field is required and stored correctly
-        """
-        msg = Message(
-            id=1,
-            date=datetime.now(UTC),
-            sender_id=1001,
-            sender_name="Test",
-            text="This is the message content",
-        )
-        assert msg.text == "This is the message content"
+@dataclass(slots=True)
+class _FakeTelethonMsg:
+    """
+    Telethon message stand-in with every attribute parse_message reads.
 
-    def test_message_has_optional_reply_to_field(self) -> None:
-        """
-        GIVEN Message dataclass
-        WHEN creating an instance with reply_to
-        THEN reply_to field is stored correctly
-        """
-        msg = Message(
-            id=1,
-            date=datetime.now(UTC),
-            sender_id=1001,
-            sender_name="Test",
-            text="Hello",
-            reply_to=456,
-        )
-        assert msg.reply_to == 456
+    A slotted dataclass keeps attribute access as cheap as on the real
+    object, unlike MagicMock or SimpleNamespace, which matters for the
+    streams of thousands of messages built by the throughput tests.
+    """
 
-    def test_message_reply_to_defaults_to_none(self) -> None:
-        """
-        GIVEN Message dataclass
-        WHEN creating an instance without reply_to
-        THEN reply_to defaults to None
-        """
-        msg = Message(
-            id=1,
-            date=datetime.now(UTC),
-            sender_id=1001,
-            sender_name="Test",
-            text="Hello",
-        )
-        assert msg.reply_to is None
+    id: int = 1
+    date: datetime = FIXED_DATE
+    sender_id: int | None = 1001
+    sender: _FakeSender | None = _FakeSender()
+    text: str | None = "Hello"
+    reply_to_msg_id: int | None = None
+    media: Any = None
+    photo: Any = None
+    video: Any = None
+    audio: Any = None
+    document: Any = None
 
-    def test_message_has_optional_media_type_field(self) -> None:
-        """
-        GIVEN Message dataclass
-        WHEN creating an instance with media_type
-        THEN media_type field is stored correctly
-        """
-        msg = Message(
-            id=1,
-            date=datetime.now(UTC),
-            sender_id=1001,
-            sender_name="Test",
-            text="Hello",
-            media_type="photo",
-        )
-        assert msg.media_type == "photo"
 
-    def test_message_media_type_defaults_to_none(self) -> None:
-        """
-        GIVEN Message dataclass
-        WHEN creating an instance without media_type
-        THEN media_type defaults to None
-        """
-        msg = Message(
-            id=1,
-            date=datetime.now(UTC),
-            sender_id=1001,
-            sender_name="Test",
-            text="Hello",
-        )
-        assert msg.media_type is None
+def _make_msg(msg_id: int) -> _FakeTelethonMsg:
+    """Build a numbered Telethon message stand-in for multi-message streams."""
+    return _FakeTelethonMsg(id=msg_id, text=f"Message {msg_id}")
 
-    def test_message_has_optional_media_path_field(self) -> None:
-        """
-        GIVEN Message dataclass
-        WHEN creating an instance with media_path
-        THEN media_path field is stored correctly
-        """
-        msg = Message(
-            id=1,
-            date=datetime.now(UTC),
-            sender_id=1001,
-            sender_name="Test",
-            text="Hello",
-            media_path="/downloads/photo.jpg",
-        )
-        assert msg.media_path == "/downloads/photo.jpg"
 
-    def test_message_media_path_defaults_to_none(self) -> None:
+def _async_stream(telegram_msgs: Iterable[Any]) -> Callable[..., AsyncIterator[Any]]:
+    """Build an iter_messages replacement that yields the given messages on every call."""
+    return lambda *_args, **_kwargs: aiter_items(telegram_msgs)
+
+
+def _async_stream_capture(
+    sink: dict[str, Any], telegram_msgs: Iterable[Any] = ()
+) -> Callable[..., AsyncIterator[Any]]:
+    """
+    Like _async_stream, but record the chat and keyword arguments into sink.
+
+    With no messages the stream is empty, for tests that only inspect the
+    arguments download_messages passes to iter_messages.
+    """
+
+    async def _iter_messages(chat: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        sink.update(kwargs, chat=chat)
+        for telegram_msg in telegram_msgs:
+            yield telegram_msg
+
+    return _iter_messages
+
+
+def _assert_message(message: Any, **expected: Any) -> None:
+    """Assert that message is a parsed Message with the expected field values."""
+    assert isinstance(message, Message)
+    for name, value in expected.items():
+        assert getattr(message, name) == value
+
+
+# Distinct non-default values for every Message field
+_MESSAGE_FIELDS: dict[str, Any] = {
+    "id": 12345,
+    "date": datetime(2024, 1, 15, 10, 30, tzinfo=UTC),
+    "sender_id": 999888777,
+    "sender_name": "John Doe",
+    "text": "This is the message content",
+    "reply_to": 456,
+    "media_type": "photo",
+    "media_path": "/downloads/photo.jpg",
+    "transcription": "This is the transcribed voice message",
+}
+
+
+@pytest.fixture(scope="module")
+def full_message() -> Message:
+    """Build one Message with every field set, shared by the field tests."""
+    return Message(**_MESSAGE_FIELDS)
+
+
+class TestMessageDataclass:
+    """Test Message dataclass structure and fields."""
+
+    @pytest.mark.parametrize("field", list(_MESSAGE_FIELDS))
+    def test_message_stores_field(self, full_message: Message, field: str) -> None:
         """
-        GIVEN Message dataclass
-        WHEN creating an instance without media_path
-        THEN media_path defaults to None
+        GIVEN a Message built with every field set
+        WHEN reading a field
+        THEN it holds the value passed at construction
         """
-        msg = Message(
-            id=1,
-            date=datetime.now(UTC),
-            sender_id=1001,
-            sender_name="Test",
-            text="Hello",
-        )
-        assert msg.media_path is None
+        assert getattr(full_message, field) == _MESSAGE_FIELDS[field]
 
-    def test_message_supports_all_media_types(self) -> None:
+    @pytest.mark.parametrize("media_type", ["photo", "audio", "video", "document"])
+    def test_message_supports_media_type(self, media_type: str) -> None:
         """
         GIVEN Message dataclass
         WHEN creating instances with different media types
         THEN all standard media types are accepted
         """
-        media_types = ["photo", "audio", "video", "document"]
-        for media_type in media_types:
-            msg = Message(
-                id=1,
-                date=datetime.now(UTC),
-                sender_id=1001,
-                sender_name="Test",
-                text="Hello",
-                media_type=media_type,
-            )
-            assert msg.media_type == media_type
+        msg = Message(**{**_MESSAGE_FIELDS, "media_type": media_type})
+        assert msg.media_type == media_type
 
-    def test_message_has_optional_transcription_field(self) -> None:
+    @pytest.mark.parametrize("field", ["reply_to", "media_type", "media_path", "transcription"])
+    def test_message_optional_field_defaults_to_none(self, field: str) -> None:
         """
         GIVEN Message dataclass
-        WHEN creating an instance with transcription
-        THEN transcription field is stored correctly
+        WHEN creating an instance without an optional field
+        THEN the field defaults to None
         """
         msg = Message(
             id=1,
-            date=datetime.now(UTC),
+            date=FIXED_DATE,
             sender_id=1001,
             sender_name="Test",
-            text="",
-            media_type="audio",
-            transcription="This is the transcribed voice message",
+            text="Hello",
         )
-        assert msg.transcription == "This is the transcribed voice message"
+        assert getattr(msg, field) is None
 
-    def test_message_transcription_defaults_to_none(self) -> None:
+    def test_message_uses_slots(self) -> None:
         """
         GIVEN Message dataclass
-        WHEN creating an instance without transcription
-        THEN transcription defaults to None
+        WHEN creating an instance
+        THEN it stores fields in slots instead of a per-instance __dict__
         """
         msg = Message(
             id=1,
-            date=datetime.now(UTC),
+            date=FIXED_DATE,
             sender_id=1001,
             sender_name="Test",
             text="Hello",
         )
-        assert msg.transcription is None
+        assert not hasattr(msg, "__dict__")
 
 
 class TestParseMessage:
@@ -255,16 +190,7 @@ class TestParseMessage:
         WHEN calling parse_message
         THEN message id is correctly extracted
         """
-        telegram_msg = MagicMock()
-        telegram_msg.id = 12345
-        telegram_msg.date = datetime.now(UTC)
-        telegram_msg.sender_id = 1001
-        telegram_msg.sender = MagicMock()
-        telegram_msg.sender.first_name = "Test"
-        telegram_msg.sender.last_name = None
-        telegram_msg.text = "Hello"
-        telegram_msg.reply_to_msg_id = None
-        telegram_msg.media = None
+        telegram_msg = _FakeTelethonMsg(id=12345)
 
         result = parse_message(telegram_msg)
         assert result.id == 12345
@@ -275,20 +201,22 @@ class TestParseMessage:
         WHEN calling parse_message
         THEN message date is correctly extracted
         """
-        now = datetime.now(UTC)
-        telegram_msg = MagicMock()
-        telegram_msg.id = 1
-        telegram_msg.date = now
-        telegram_msg.sender_id = 1001
-        telegram_msg.sender = MagicMock()
-        telegram_msg.sender.first_name = "Test"
-        telegram_msg.sender.last_name = None
-        telegram_msg.text = "Hello"
-        telegram_msg.reply_to_msg_id = None
-        telegram_msg.media = None
+        sent_at = datetime(2024, 3, 15, 9, 45, tzinfo=UTC)
+        telegram_msg = _FakeTelethonMsg(date=sent_at)
 
         result = parse_message(telegram_msg)
-        assert result.date == now
+        assert result.date == sent_at
+
+    def test_parse_message_passes_date_through(self) -> None:
+        """
+        GIVEN a Telegram message with a UTC-aware date
+        WHEN calling parse_message
+        THEN the same datetime object is reused rather than converted
+        """
+        telegram_msg = _FakeTelethonMsg(date=datetime(2024, 3, 15, 9, 45, tzinfo=UTC))
+
+        result = parse_message(telegram_msg)
+        assert result.date is telegram_msg.date
 
     def test_parse_message_extracts_sender_id(self) -> None:
         """
@@ -296,16 +224,7 @@ class TestParseMessage:
         WHEN calling parse_message
         THEN sender_id is correctly extracted
         """
-        telegram_msg = MagicMock()
-        telegram_msg.id = 1
-        telegram_msg.date = datetime.now(UTC)
-        telegram_msg.sender_id = 999888777
-        telegram_msg.sender = MagicMock()
-        telegram_msg.sender.first_name = "Test"
-        telegram_msg.sender.last_name = None
-        telegram_msg.text = "Hello"
-        telegram_msg.reply_to_msg_id = None
-        telegram_msg.media = None
+        telegram_msg = _FakeTelethonMsg(sender_id=999888777)
 
         result = parse_message(telegram_msg)
         assert result.sender_id == 999888777
@@ -316,16 +235,7 @@ class TestParseMessage:
         WHEN calling parse_message
         THEN sender_name contains the first name
         """
-        telegram_msg = MagicMock()
-        telegram_msg.id = 1
-        telegram_msg.date = datetime.now(UTC)
-        telegram_msg.sender_id = 1001
-        telegram_msg.sender = MagicMock()
-        telegram_msg.sender.first_name = "John"
-        telegram_msg.sender.last_name = None
-        telegram_msg.text = "Hello"
-        telegram_msg.reply_to_msg_id = None
-        telegram_msg.media = None
+        telegram_msg = _FakeTelethonMsg(sender=_FakeSender(first_name="John"))
 
         result = parse_message(telegram_msg)
         assert result.sender_name == "John"
@@ -336,16 +246,7 @@ class TestParseMessage:
         WHEN calling parse_message
         THEN sender_name contains full name
         """
-        telegram_msg = MagicMock()
-        telegram_msg.id = 1
-        telegram_msg.date = datetime.now(UTC)
-        telegram_msg.sender_id = 1001
-        telegram_msg.sender = MagicMock()
-        telegram_msg.sender.first_name = "John"
-        telegram_msg.sender.last_name = "Doe"
-        telegram_msg.text = "Hello"
-        telegram_msg.reply_to_msg_id = None
-        telegram_msg.media = None
+        telegram_msg = _FakeTelethonMsg(sender=_FakeSender(first_name="John", last_name="Doe"))
 
         result = parse_message(telegram_msg)
         assert result.sender_name == "John Doe"
@@ -356,35 +257,46 @@ class TestParseMessage:
         WHEN calling parse_message
         THEN sender_name is set to "Unknown"
         """
-        telegram_msg = MagicMock()
-        telegram_msg.id = 1
-        telegram_msg.date = datetime.now(UTC)
-        telegram_msg.sender_id = None
-        telegram_msg.sender = None
-        telegram_msg.text = "Hello"
-        telegram_msg.reply_to_msg_id = None
-        telegram_msg.media = None
+        telegram_msg = _FakeTelethonMsg(sender_id=None, sender=None)
 
         result = parse_message(telegram_msg)
         assert result.sender_name == "Unknown"
         assert result.sender_id == 0
 
+    def test_parse_message_reuses_cached_sender_name(self) -> None:
+        """
+        GIVEN a sender name cache filled by an earlier message
+        WHEN parsing another message from the same sender
+        THEN the cached name is used
+        """
+        sender_names: dict[int, str] = {}
+        first = _FakeTelethonMsg(sender_id=7, sender=_FakeSender(first_name="John"))
+        second = _FakeTelethonMsg(sender_id=7, sender=_FakeSender(first_name="Renamed"))
+
+        assert parse_message(first, sender_names).sender_name == "John"
+        assert parse_message(second, sender_names).sender_name == "John"
+        assert sender_names == {7: "John"}
+
+    def test_parse_message_does_not_cache_missing_sender(self) -> None:
+        """
+        GIVEN a message whose sender entity was not resolved
+        WHEN parsing it with a sender name cache
+        THEN "Unknown" is not cached for that sender_id
+        """
+        sender_names: dict[int, str] = {}
+
+        result = parse_message(_FakeTelethonMsg(sender_id=7, sender=None), sender_names)
+
+        assert result.sender_name == "Unknown"
+        assert sender_names == {}
+
     def test_parse_message_extracts_text(self) -> None:
         """
         GIVEN a Telegram message with text
         WHEN calling parse_message
         THEN text is correctly extracted
         """
-        telegram_msg = MagicMock()
-        telegram_msg.id = 1
-        telegram_msg.date = datetime.now(UTC)
-        telegram_msg.sender_id = 1001
-        telegram_msg.sender = MagicMock()
-        telegram_msg.sender.first_name = "Test"
-        telegram_msg.sender.last_name = None
-        telegram_msg.text = "This is the message content"
-        telegram_msg.reply_to_msg_id = None
-        telegram_msg.media = None
+        telegram_msg = _FakeTelethonMsg(text="This is the message content")
 
         result = parse_message(telegram_msg)
         assert result.text == "This is the message content"
@@ -395,16 +307,7 @@ class TestParseMessage:
         WHEN calling parse_message
         THEN text is empty string
         """
-        telegram_msg = MagicMock()
-        telegram_msg.id = 1
-        telegram_msg.date = datetime.now(UTC)
-        telegram_msg.sender_id = 1001
-        telegram_msg.sender = MagicMock()
-        telegram_msg.sender.first_name = "Test"
-        telegram_msg.sender.last_name = None
-        telegram_msg.text = None
-        telegram_msg.reply_to_msg_id = None
-        telegram_msg.media = None
+        telegram_msg = _FakeTelethonMsg(text=None)
 
         result = parse_message(telegram_msg)
         assert result.text == ""
@@ -415,109 +318,22 @@ class TestParseMessage:
         WHEN calling parse_message
         THEN reply_to contains the original message ID
         """
-        telegram_msg = MagicMock()
-        telegram_msg.id = 1
-        telegram_msg.date = datetime.now(UTC)
-        telegram_msg.sender_id = 1001
-        telegram_msg.sender = MagicMock()
-        telegram_msg.sender.first_name = "Test"
-        telegram_msg.sender.last_name = None
-        telegram_msg.text = "Hello"
-        telegram_msg.reply_to_msg_id = 456
-        telegram_msg.media = None
+        telegram_msg = _FakeTelethonMsg(reply_to_msg_id=456)
 
         result = parse_message(telegram_msg)
         assert result.reply_to == 456
 
-    def test_parse_message_detects_photo_media(self) -> None:
-        """
-        GIVEN a Telegram message with photo
-        WHEN calling parse_message
-        THEN media_type is "photo"
-        """
-        telegram_msg = MagicMock()
-        telegram_msg.id = 1
-        telegram_msg.date = datetime.now(UTC)
-        telegram_msg.sender_id = 1001
-        telegram_msg.sender = MagicMock()
-        telegram_msg.sender.first_name = "Test"
-        telegram_msg.sender.last_name = None
-        telegram_msg.text = "Check this photo"
-        telegram_msg.reply_to_msg_id = None
-        telegram_msg.photo = MagicMock()  # Has photo attribute
-        telegram_msg.media = MagicMock()
-
-        result = parse_message(telegram_msg)
-        assert result.media_type == "photo"
-
-    def test_parse_message_detects_video_media(self) -> None:
-        """
-        GIVEN a Telegram message with video
-        WHEN calling parse_message
-        THEN media_type is "video"
-        """
-        telegram_msg = MagicMock()
-        telegram_msg.id = 1
-        telegram_msg.date = datetime.now(UTC)
-        telegram_msg.sender_id = 1001
-        telegram_msg.sender = MagicMock()
-        telegram_msg.sender.first_name = "Test"
-        telegram_msg.sender.last_name = None
-        telegram_msg.text = "Check this video"
-        telegram_msg.reply_to_msg_id = None
-        telegram_msg.photo = None
-        telegram_msg.video = MagicMock()  # Has video attribute
-        telegram_msg.media = MagicMock()
-
-        result = parse_message(telegram_msg)
-        assert result.media_type == "video"
-
-    def test_parse_message_detects_audio_media(self) -> None:
+    @pytest.mark.parametrize("attr", ["photo", "video", "audio", "document"])
+    def test_parse_message_detects_media(self, attr: str) -> None:
         """
-        GIVEN a Telegram message with audio
+        GIVEN a Telegram message with photo, video, audio or document
         WHEN calling parse_message
-        THEN media_type is "audio"
-        """
-        telegram_msg = MagicMock()
-        telegram_msg.id = 1
-        telegram_msg.date = datetime.now(UTC)
-        telegram_msg.sender_id = 1001
-        telegram_msg.sender = MagicMock()
-        telegram_msg.sender.first_name = "Test"
-        telegram_msg.sender.last_name = None
-        telegram_msg.text = "Check this audio"
-        telegram_msg.reply_to_msg_id = None
-        telegram_msg.photo = None
-        telegram_msg.video = None
-        telegram_msg.audio = MagicMock()  # Has audio attribute
-        telegram_msg.media = MagicMock()
-
-        result = parse_message(telegram_msg)
-        assert result.media_type == "audio"
-
-    def test_parse_message_detects_document_media(self) -> None:
+        THEN media_type names the attached media kind
         """
-        GIVEN a Telegram message with document
-        WHEN calling parse_message
-        THEN media_type is "document"
-        """
-        telegram_msg = MagicMock()
-        telegram_msg.id = 1
-        telegram_msg.date = datetime.now(UTC)
-        telegram_msg.sender_id = 1001
-        telegram_msg.sender = MagicMock()
-        telegram_msg.sender.first_name = "Test"
-        telegram_msg.sender.last_name = None
-        telegram_msg.text = "Check this file"
-        telegram_msg.reply_to_msg_id = None
-        telegram_msg.photo = None
-        telegram_msg.video = None
-        telegram_msg.audio = None
-        telegram_msg.document = MagicMock()  # Has document attribute
-        telegram_msg.media = MagicMock()
+        telegram_msg = _FakeTelethonMsg(media=_PRESENT, **{attr: _PRESENT})
 
         result = parse_message(telegram_msg)
-        assert result.media_type == "document"
+        assert result.media_type == attr
 
 
 class TestMessageDownloader:
@@ -578,7 +394,8 @@ class TestMessageDownloader:
 class TestDownloadMessages:
     """Test download_messages method for iterating through chat messages."""
 
-    @pytest.mark.asyncio
+    pytestmark = pytest.mark.asyncio(loop_scope="session")
+
     async def test_download_messages_yields_messages(self) -> None:
         """
         GIVEN a chat with messages
@@ -588,36 +405,16 @@ class TestDownloadMessages:
         mock_client = MagicMock()
 
         # Create mock Telegram messages
-        mock_telegram_msg = MagicMock()
-        mock_telegram_msg.id = 1
-        mock_telegram_msg.date = datetime.now(UTC)
-        mock_telegram_msg.sender_id = 1001
-        mock_telegram_msg.sender = MagicMock()
-        mock_telegram_msg.sender.first_name = "Test"
-        mock_telegram_msg.sender.last_name = None
-        mock_telegram_msg.text = "Hello"
-        mock_telegram_msg.reply_to_msg_id = None
-        mock_telegram_msg.media = None
-        mock_telegram_msg.photo = None
-        mock_telegram_msg.video = None
-        mock_telegram_msg.audio = None
-        mock_telegram_msg.document = None
-
-        async def mock_iter_messages(*_args, **_kwargs):
-            yield mock_telegram_msg
-
-        mock_client.iter_messages = mock_iter_messages
+        mock_telegram_msg = _FakeTelethonMsg()
+
+        mock_client.iter_messages = _async_stream([mock_telegram_msg])
 
         downloader = MessageDownloader(client=mock_client)
-        messages = []
-        async for msg in downloader.download_messages(chat="test_chat"):
-            messages.append(msg)
+        messages = [msg async for msg in downloader.download_messages(chat="test_chat")]
 
         assert len(messages) == 1
-        assert isinstance(messages[0], Message)
-        assert messages[0].id == 1
+        _assert_message(messages[0], id=1)
 
-    @pytest.mark.asyncio
     async def test_download_messages_accepts_chat_name(self) -> None:
         """
         GIVEN a chat name string
@@ -626,23 +423,15 @@ class TestDownloadMessages:
         """
         mock_client = MagicMock()
 
-        captured_chat = None
-
-        async def mock_iter_messages(chat, **_kwargs):
-            nonlocal captured_chat
-            captured_chat = chat
-            return
-            yield  # Make it an async generator
-
-        mock_client.iter_messages = mock_iter_messages
+        captured: dict[str, Any] = {}
+        mock_client.iter_messages = _async_stream_capture(captured)
 
         downloader = MessageDownloader(client=mock_client)
         async for _ in downloader.download_messages(chat="my_channel"):
             pass
 
-        assert captured_chat == "my_channel"
+        assert captured["chat"] == "my_channel"
 
-    @pytest.mark.asyncio
     async def test_download_messages_accepts_chat_id(self) -> None:
         """
         GIVEN a chat ID integer
@@ -651,23 +440,15 @@ class TestDownloadMessages:
         """
         mock_client = MagicMock()
 
-        captured_chat = None
-
-        async def mock_iter_messages(chat, **_kwargs):
-            nonlocal captured_chat
-            captured_chat = chat
-            return
-            yield
-
-        mock_client.iter_messages = mock_iter_messages
+        captured: dict[str, Any] = {}
+        mock_client.iter_messages = _async_stream_capture(captured)
 
         downloader = MessageDownloader(client=mock_client)
         async for _ in downloader.download_messages(chat=-1001234567890):
             pass
 
-        assert captured_chat == -1001234567890
+        assert captured["chat"] == -1001234567890
 
-    @pytest.mark.asyncio
     async def test_download_messages_respects_from_date(self) -> None:
         """
         GIVEN a from_date parameter
@@ -679,52 +460,20 @@ class TestDownloadMessages:
         from_date = datetime(2024, 1, 15, tzinfo=UTC)
 
         # Create messages with different dates
-        old_msg = MagicMock()
-        old_msg.id = 1
-        old_msg.date = datetime(2024, 1, 10, tzinfo=UTC)  # Before from_date
-        old_msg.sender_id = 1001
-        old_msg.sender = MagicMock()
-        old_msg.sender.first_name = "Test"
-        old_msg.sender.last_name = None
-        old_msg.text = "Old message"
-        old_msg.reply_to_msg_id = None
-        old_msg.media = None
-        old_msg.photo = None
-        old_msg.video = None
-        old_msg.audio = None
-        old_msg.document = None
-
-        new_msg = MagicMock()
-        new_msg.id = 2
-        new_msg.date = datetime(2024, 1, 20, tzinfo=UTC)  # After from_date
-        new_msg.sender_id = 1001
-        new_msg.sender = MagicMock()
-        new_msg.sender.first_name = "Test"
-        new_msg.sender.last_name = None
-        new_msg.text = "New message"
-        new_msg.reply_to_msg_id = None
-        new_msg.media = None
-        new_msg.photo = None
-        new_msg.video = None
-        new_msg.audio = None
-        new_msg.document = None
-
-        async def mock_iter_messages(_chat, **_kwargs):
-            # Telethon returns newest first by default
-            yield new_msg
-            yield old_msg
-
-        mock_client.iter_messages = mock_iter_messages
+        old_msg = _FakeTelethonMsg(id=1, date=datetime(2024, 1, 10, tzinfo=UTC), text="Old message")
+        new_msg = _FakeTelethonMsg(id=2, date=datetime(2024, 1, 20, tzinfo=UTC), text="New message")
+
+        # Telethon returns newest first by default
+        mock_client.iter_messages = _async_stream([new_msg, old_msg])
 
         downloader = MessageDownloader(client=mock_client)
-        messages = []
-        async for msg in downloader.download_messages(chat="test", from_date=from_date):
-            messages.append(msg)
+        messages = [
+            msg async for msg in downloader.download_messages(chat="test", from_date=from_date)
+        ]
 
         assert len(messages) == 1
-        assert messages[0].id == 2
+        _assert_message(messages[0], id=2, text="New message")
 
-    @pytest.mark.asyncio
     async def test_download_messages_respects_to_date(self) -> None:
         """
         GIVEN a to_date parameter
@@ -735,55 +484,17 @@ class TestDownloadMessages:
 
         to_date = datetime(2024, 1, 15, tzinfo=UTC)
 
-        # Create messages with different dates
-        old_msg = MagicMock()
-        old_msg.id = 1
-        old_msg.date = datetime(2024, 1, 10, tzinfo=UTC)  # Before to_date
-        old_msg.sender_id = 1001
-        old_msg.sender = MagicMock()
-        old_msg.sender.first_name = "Test"
-        old_msg.sender.last_name = None
-        old_msg.text = "Old message"
-        old_msg.reply_to_msg_id = None
-        old_msg.media = None
-        old_msg.photo = None
-        old_msg.video = None
-        old_msg.audio = None
-        old_msg.document = None
-
-        new_msg = MagicMock()
-        new_msg.id = 2
-        new_msg.date = datetime(2024, 1, 20, tzinfo=UTC)  # After to_date
-        new_msg.sender_id = 1001
-        new_msg.sender = MagicMock()
-        new_msg.sender.first_name = "Test"
-        new_msg.sender.last_name = None
-        new_msg.text = "New message"
-        new_msg.reply_to_msg_id = None
-        new_msg.media = None
-        new_msg.photo = None
-        new_msg.video = None
-        new_msg.audio = None
-        new_msg.document = None
-
-        captured_offset_date = None
-
-        async def mock_iter_messages(_chat, **kwargs):
-            nonlocal captured_offset_date
-            captured_offset_date = kwargs.get("offset_date")
-            yield old_msg
-
-        mock_client.iter_messages = mock_iter_messages
+        old_msg = _FakeTelethonMsg(id=1, date=datetime(2024, 1, 10, tzinfo=UTC), text="Old message")
+
+        captured: dict[str, Any] = {}
+        mock_client.iter_messages = _async_stream_capture(captured, [old_msg])
 
         downloader = MessageDownloader(client=mock_client)
-        messages = []
-        async for msg in downloader.download_messages(chat="test", to_date=to_date):
-            messages.append(msg)
+        messages = [msg async for msg in downloader.download_messages(chat="test", to_date=to_date)]
 
-        assert captured_offset_date == to_date
+        assert captured["offset_date"] == to_date
         assert len(messages) == 1
 
-    @pytest.mark.asyncio
     async def test_download_messages_respects_limit(self) -> None:
         """
         GIVEN a limit parameter
@@ -792,97 +503,108 @@ class TestDownloadMessages:
         """
         mock_client = MagicMock()
 
-        def create_mock_msg(msg_id: int):
-            msg = MagicMock()
-            msg.id = msg_id
-            msg.date = datetime.now(UTC)
-            msg.sender_id = 1001
-            msg.sender = MagicMock()
-            msg.sender.first_name = "Test"
-            msg.sender.last_name = None
-            msg.text = f"Message {msg_id}"
-            msg.reply_to_msg_id = None
-            msg.media = None
-            msg.photo = None
-            msg.video = None
-            msg.audio = None
-            msg.document = None
-            return msg
-
-        captured_limit = None
-
-        async def mock_iter_messages(_chat, **kwargs):
-            nonlocal captured_limit
-            captured_limit = kwargs.get("limit")
-            for i in range(5):
-                yield create_mock_msg(i)
+        captured: dict[str, Any] = {}
+        mock_client.iter_messages = _async_stream_capture(
+            captured, [_make_msg(i) for i in range(5)]
+        )
+
+        downloader = MessageDownloader(client=mock_client)
+        messages = [msg async for msg in downloader.download_messages(chat="test", limit=3)]
+
+        assert captured["limit"] == 3
+        assert len(messages) == 3
+
+    async def test_download_messages_disables_client_wait_time(self) -> None:
+        """
+        GIVEN an unlimited download
+        WHEN calling download_messages
+        THEN iter_messages gets wait_time=0, leaving rate limiting to delay_seconds
+        """
+        mock_client = MagicMock()
 
-        mock_client.iter_messages = mock_iter_messages
+        captured: dict[str, Any] = {}
+        mock_client.iter_messages = _async_stream_capture(captured)
 
         downloader = MessageDownloader(client=mock_client)
-        messages = []
-        async for msg in downloader.download_messages(chat="test", limit=3):
-            messages.append(msg)
-            if len(messages) >= 3:
-                break
+        async for _ in downloader.download_messages(chat="test"):
+            pass
 
-        assert captured_limit == 3
+        assert captured["wait_time"] == 0
 
-    @pytest.mark.asyncio
-    async def test_download_messages_adds_delay_between_batches(self) -> None:
+    @pytest.mark.parametrize("dedup", [True, False])
+    async def test_download_messages_adds_delay_between_batches(
+        self, mock_sleep: AsyncMock, dedup: bool
+    ) -> None:
         """
-        GIVEN a configured delay_seconds
+        GIVEN a configured delay_seconds, with or without dedup filtering
         WHEN downloading multiple batches
         THEN delay is added between batches to respect rate limits
         """
         mock_client = MagicMock()
 
-        def create_mock_msg(msg_id: int):
-            msg = MagicMock()
-            msg.id = msg_id
-            msg.date = datetime.now(UTC)
-            msg.sender_id = 1001
-            msg.sender = MagicMock()
-            msg.sender.first_name = "Test"
-            msg.sender.last_name = None
-            msg.text = f"Message {msg_id}"
-            msg.reply_to_msg_id = None
-            msg.media = None
-            msg.photo = None
-            msg.video = None
-            msg.audio = None
-            msg.document = None
-            return msg
-
-        async def mock_iter_messages(_chat, **_kwargs):
-            # Return 25 messages - will trigger 2 delays with batch_size=10
-            for i in range(25):
-                yield create_mock_msg(i)
-
-        mock_client.iter_messages = mock_iter_messages
+        # Return 25 messages - will trigger 2 delays with batch_size=10
+        mock_client.iter_messages = _async_stream([_make_msg(i) for i in range(25)])
 
         # batch_size=10 means delay every 10 messages
         # With 25 messages: delay after msg 10, delay after msg 20
         # That's 2 delays of 0.05s each
         downloader = MessageDownloader(client=mock_client, batch_size=10, delay_seconds=0.05)
 
-        start_time = asyncio.get_event_loop().time()
-        messages = []
-        async for msg in downloader.download_messages(chat="test"):
-            messages.append(msg)
-
-        elapsed = asyncio.get_event_loop().time() - start_time
+        messages = [msg async for msg in downloader.download_messages(chat="test", dedup=dedup)]
 
         # We should have processed 25 messages with 2 delays
         assert len(messages) == 25
-        # At least some delay was added (2 * 0.05 = 0.1s minimum)
-        assert elapsed >= 0.08  # Give some tolerance
+        assert mock_sleep.await_args_list == [call(0.05), call(0.05)]
+
+    @pytest.mark.slow
+    @pytest.mark.real_sleep
+    async def test_download_messages_delays_batches_in_real_time(self) -> None:
+        """
+        GIVEN a configured delay_seconds and a real clock
+        WHEN downloading multiple batches
+        THEN the wall-clock time covers the delays between batches
+        """
+        mock_client = MagicMock()
+        mock_client.iter_messages = _async_stream([_make_msg(i) for i in range(25)])
+        downloader = MessageDownloader(client=mock_client, batch_size=10, delay_seconds=0.05)
+
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        messages = [msg async for msg in downloader.download_messages(chat="test")]
+        elapsed = loop.time() - start_time
+
+        assert len(messages) == 25
+        # Two delays of 0.05s, with some tolerance for timer resolution
+        assert elapsed >= 0.08
+
+    @pytest.mark.slow
+    async def test_download_messages_throughput_for_large_chat(self) -> None:
+        """
+        GIVEN a chat with 1000 messages and no rate-limit delay
+        WHEN downloading all of them
+        THEN every message is parsed well within the per-run time budget
+        """
+        mock_client = MagicMock()
+        mock_client.iter_messages = _async_stream([_make_msg(i) for i in range(1000)])
+
+        downloader = MessageDownloader(client=mock_client, delay_seconds=0)
+
+        start_ns = time.perf_counter_ns()
+        messages = [msg async for msg in downloader.download_messages(chat="test")]
+        elapsed_ns = time.perf_counter_ns() - start_ns
+
+        assert len(messages) == 1000
+        _assert_message(messages[-1], id=999, text="Message 999")
+        # Generous ceiling: regressions in per-message overhead show up as
+        # multiples of this, not as noise
+        assert elapsed_ns < 50_000_000
 
 
 class TestProgressTracking:
     """Test progress tracking during download."""
 
-    @pytest.mark.asyncio
+    pytestmark = pytest.mark.asyncio(loop_scope="session")
+
     async def test_download_messages_calls_progress_callback(self) -> None:
         """
         GIVEN a progress_callback parameter
@@ -891,28 +613,7 @@ class TestProgressTracking:
         """
         mock_client = MagicMock()
 
-        def create_mock_msg(msg_id: int):
-            msg = MagicMock()
-            msg.id = msg_id
-            msg.date = datetime.now(UTC)
-            msg.sender_id = 1001
-            msg.sender = MagicMock()
-            msg.sender.first_name = "Test"
-            msg.sender.last_name = None
-            msg.text = f"Message {msg_id}"
-            msg.reply_to_msg_id = None
-            msg.media = None
-            msg.photo = None
-            msg.video = None
-            msg.audio = None
-            msg.document = None
-            return msg
-
-        async def mock_iter_messages(_chat, **_kwargs):
-            for i in range(5):
-                yield create_mock_msg(i)
-
-        mock_client.iter_messages = mock_iter_messages
+        mock_client.iter_messages = _async_stream([_make_msg(i) for i in range(5)])
 
         progress_calls = []
 
@@ -920,17 +621,122 @@ class TestProgressTracking:
             progress_calls.append((current, total))
 
         downloader = MessageDownloader(client=mock_client)
-        messages = []
-        async for msg in downloader.download_messages(
-            chat="test", progress_callback=progress_callback
-        ):
-            messages.append(msg)
+        messages = [
+            msg
+            async for msg in downloader.download_messages(
+                chat="test", progress_callback=progress_callback
+            )
+        ]
 
+        assert len(messages) == 5
         assert len(progress_calls) > 0
         # Last call should have the final count
         assert progress_calls[-1][0] == 5
 
-    @pytest.mark.asyncio
+    async def test_progress_callback_is_coalesced_on_large_chats(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """
+        GIVEN a chat with many more messages than the progress delta
+        WHEN downloading with progress callback
+        THEN updates are offered every PROGRESS_MIN_DELTA messages and the
+            final count is always delivered last
+        """
+        mock_client = MagicMock()
+        mock_client.iter_messages = _async_stream([_make_msg(i) for i in range(200)])
+
+        progress_calls = []
+
+        def progress_callback(current: int, total: int | None) -> None:
+            progress_calls.append((current, total))
+
+        # Take wall-clock timing out of the picture
+        monkeypatch.setattr(MessageDownloader, "PROGRESS_MIN_INTERVAL_MS", 10**9)
+        downloader = MessageDownloader(client=mock_client)
+        messages = [
+            msg
+            async for msg in downloader.download_messages(
+                chat="test", progress_callback=progress_callback
+            )
+        ]
+
+        assert len(messages) == 200
+        delivered = [current for current, _ in progress_calls]
+        # Undelivered intermediate updates may be dropped, never reordered
+        assert set(delivered) <= {64, 128, 192, 200}
+        assert delivered == sorted(delivered)
+        assert delivered[-1] == 200
+
+    async def test_plain_progress_callback_runs_on_event_loop_thread(self) -> None:
+        """
+        GIVEN a plain (non-async) progress_callback
+        WHEN downloading messages
+        THEN every call happens on the event loop's thread, not a worker thread
+        """
+        mock_client = MagicMock()
+        mock_client.iter_messages = _async_stream([_make_msg(i) for i in range(5)])
+
+        threads: list[int] = []
+
+        def progress_callback(_current: int, _total: int | None) -> None:
+            threads.append(threading.get_ident())
+
+        downloader = MessageDownloader(client=mock_client)
+        await downloader.download_all(chat="test", progress_callback=progress_callback)
+
+        assert threads
+        assert set(threads) == {threading.get_ident()}
+
+    async def test_progress_callback_can_be_coroutine_function(self) -> None:
+        """
+        GIVEN an async progress_callback
+        WHEN downloading messages
+        THEN the callback is awaited with the final count
+        """
+        mock_client = MagicMock()
+        mock_client.iter_messages = _async_stream([_make_msg(i) for i in range(5)])
+
+        progress_calls = []
+
+        async def progress_callback(current: int, total: int | None) -> None:
+            progress_calls.append((current, total))
+
+        downloader = MessageDownloader(client=mock_client)
+        messages = [
+            msg
+            async for msg in downloader.download_messages(
+                chat="test", progress_callback=progress_callback
+            )
+        ]
+
+        assert len(messages) == 5
+        assert progress_calls[-1] == (5, None)
+
+    async def test_progress_delivery_stops_when_download_is_abandoned(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """
+        GIVEN a download with a progress callback
+        WHEN the consumer closes the stream early
+        THEN no further progress is delivered
+        """
+        mock_client = MagicMock()
+        mock_client.iter_messages = _async_stream([_make_msg(i) for i in range(5)])
+
+        progress_calls = []
+
+        def progress_callback(current: int, total: int | None) -> None:
+            progress_calls.append((current, total))
+
+        # Offer an update for every message
+        monkeypatch.setattr(MessageDownloader, "PROGRESS_MIN_DELTA", 1)
+        downloader = MessageDownloader(client=mock_client)
+        stream = downloader.download_messages(chat="test", progress_callback=progress_callback)
+        await anext(stream)
+        await stream.aclose()
+
+        assert progress_calls == []
+
     async def test_progress_callback_receives_total_when_known(self) -> None:
         """
         GIVEN a chat with known message count
@@ -940,30 +746,9 @@ class TestProgressTracking:
         mock_client = MagicMock()
 
         # Mock get_messages to get total count
-        mock_client.get_messages = AsyncMock(return_value=MagicMock(total=100))
-
-        def create_mock_msg(msg_id: int):
-            msg = MagicMock()
-            msg.id = msg_id
-            msg.date = datetime.now(UTC)
-            msg.sender_id = 1001
-            msg.sender = MagicMock()
-            msg.sender.first_name = "Test"
-            msg.sender.last_name = None
-            msg.text = f"Message {msg_id}"
-            msg.reply_to_msg_id = None
-            msg.media = None
-            msg.photo = None
-            msg.video = None
-            msg.audio = None
-            msg.document = None
-            return msg
-
-        async def mock_iter_messages(_chat, **_kwargs):
-            for i in range(5):
-                yield create_mock_msg(i)
+        mock_client.get_messages = AsyncMock(return_value=SimpleNamespace(total=100))
 
-        mock_client.iter_messages = mock_iter_messages
+        mock_client.iter_messages = _async_stream([_make_msg(i) for i in range(5)])
 
         progress_calls = []
 
@@ -971,20 +756,90 @@ class TestProgressTracking:
             progress_calls.append((current, total))
 
         downloader = MessageDownloader(client=mock_client)
-        messages = []
-        async for msg in downloader.download_messages(
-            chat="test", progress_callback=progress_callback, fetch_total=True
-        ):
-            messages.append(msg)
+        messages = [
+            msg
+            async for msg in downloader.download_messages(
+                chat="test", progress_callback=progress_callback, fetch_total=True
+            )
+        ]
 
+        assert len(messages) == 5
         # Check that total was passed
         assert any(call[1] == 100 for call in progress_calls)
 
+    async def test_total_is_fetched_concurrently_with_first_page(self) -> None:
+        """
+        GIVEN a total-count request that only completes once iteration starts
+        WHEN downloading with fetch_total=True
+        THEN the download does not wait for the total before iterating
+        """
+        first_page = asyncio.Event()
+
+        async def get_messages(*_args: Any, **_kwargs: Any) -> SimpleNamespace:
+            await first_page.wait()
+            return SimpleNamespace(total=100)
+
+        async def iter_messages(*_args: Any, **_kwargs: Any) -> AsyncIterator[Any]:
+            first_page.set()
+            for i in range(5):
+                yield _make_msg(i)
+
+        mock_client = MagicMock()
+        mock_client.get_messages = get_messages
+        mock_client.iter_messages = iter_messages
+
+        progress_calls = []
+
+        def progress_callback(current: int, total: int | None) -> None:
+            progress_calls.append((current, total))
+
+        downloader = MessageDownloader(client=mock_client)
+
+        async def download() -> list[Message]:
+            return [
+                msg
+                async for msg in downloader.download_messages(
+                    chat="test", progress_callback=progress_callback, fetch_total=True
+                )
+            ]
+
+        messages = await asyncio.wait_for(download(), timeout=1)
+
+        assert len(messages) == 5
+        assert progress_calls[-1] == (5, 100)
+
+    async def test_progress_continues_without_total_when_fetch_fails(self) -> None:
+        """
+        GIVEN a total-count request that fails
+        WHEN downloading with fetch_total=True
+        THEN progress is still reported, with an unknown total
+        """
+        mock_client = MagicMock()
+        mock_client.get_messages = AsyncMock(side_effect=RuntimeError("flood wait"))
+        mock_client.iter_messages = _async_stream([_make_msg(i) for i in range(5)])
+
+        progress_calls = []
+
+        def progress_callback(current: int, total: int | None) -> None:
+            progress_calls.append((current, total))
+
+        downloader = MessageDownloader(client=mock_client)
+        messages = [
+            msg
+            async for msg in downloader.download_messages(
+                chat="test", progress_callback=progress_callback, fetch_total=True
+            )
+        ]
+
+        assert len(messages) == 5
+        assert progress_calls[-1] == (5, None)
+
 
 class TestReverseAndMinId:
     """Test reverse and min_id parameters for chronological download."""
 
-    @pytest.mark.asyncio
+    pytestmark = pytest.mark.asyncio(loop_scope="session")
+
     async def test_download_messages_with_reverse_true_passes_reverse_to_client(self) -> None:
         """
         GIVEN reverse=True parameter
@@ -993,23 +848,15 @@ class TestReverseAndMinId:
         """
         mock_client = MagicMock()
 
-        captured_reverse = None
-
-        async def mock_iter_messages(_chat, **kwargs):
-            nonlocal captured_reverse
-            captured_reverse = kwargs.get("reverse")
-            return
-            yield  # Make it an async generator
-
-        mock_client.iter_messages = mock_iter_messages
+        captured: dict[str, Any] = {}
+        mock_client.iter_messages = _async_stream_capture(captured)
 
         downloader = MessageDownloader(client=mock_client)
         async for _ in downloader.download_messages(chat="test", reverse=True):
             pass
 
-        assert captured_reverse is True
+        assert captured["reverse"] is True
 
-    @pytest.mark.asyncio
     async def test_download_messages_with_reverse_false_does_not_pass_reverse(self) -> None:
         """
         GIVEN reverse=False parameter (default)
@@ -1018,24 +865,16 @@ class TestReverseAndMinId:
         """
         mock_client = MagicMock()
 
-        captured_kwargs = {}
-
-        async def mock_iter_messages(_chat, **kwargs):
-            nonlocal captured_kwargs
-            captured_kwargs = kwargs
-            return
-            yield
-
-        mock_client.iter_messages = mock_iter_messages
+        captured: dict[str, Any] = {}
+        mock_client.iter_messages = _async_stream_capture(captured)
 
         downloader = MessageDownloader(client=mock_client)
         async for _ in downloader.download_messages(chat="test", reverse=False):
             pass
 
         # reverse should not be passed when False (default behavior)
-        assert captured_kwargs.get("reverse") is None or captured_kwargs.get("reverse") is False
+        assert captured.get("reverse") is None or captured.get("reverse") is False
 
-    @pytest.mark.asyncio
     async def test_download_messages_with_min_id_passes_min_id_to_client(self) -> None:
         """
         GIVEN min_id=0 parameter
@@ -1044,23 +883,15 @@ class TestReverseAndMinId:
         """
         mock_client = MagicMock()
 
-        captured_min_id = None
-
-        async def mock_iter_messages(_chat, **kwargs):
-            nonlocal captured_min_id
-            captured_min_id = kwargs.get("min_id")
-            return
-            yield
-
-        mock_client.iter_messages = mock_iter_messages
+        captured: dict[str, Any] = {}
+        mock_client.iter_messages = _async_stream_capture(captured)
 
         downloader = MessageDownloader(client=mock_client)
         async for _ in downloader.download_messages(chat="test", min_id=0):
             pass
 
-        assert captured_min_id == 0
+        assert captured["min_id"] == 0
 
-    @pytest.mark.asyncio
     async def test_download_messages_default_min_id_is_none(self) -> None:
         """
         GIVEN no min_id parameter
@@ -1069,23 +900,15 @@ class TestReverseAndMinId:
         """
         mock_client = MagicMock()
 
-        captured_kwargs = {}
-
-        async def mock_iter_messages(_chat, **kwargs):
-            nonlocal captured_kwargs
-            captured_kwargs = kwargs
-            return
-            yield
-
-        mock_client.iter_messages = mock_iter_messages
+        captured: dict[str, Any] = {}
+        mock_client.iter_messages = _async_stream_capture(captured)
 
         downloader = MessageDownloader(client=mock_client)
         async for _ in downloader.download_messages(chat="test"):
             pass
 
-        assert "min_id" not in captured_kwargs or captured_kwargs.get("min_id") is None
+        assert "min_id" not in captured or captured.get("min_id") is None
 
-    @pytest.mark.asyncio
     async def test_download_messages_reverse_and_min_id_together(self) -> None:
         """
         GIVEN reverse=True and min_id=0 parameters
@@ -1094,30 +917,221 @@ class TestReverseAndMinId:
         """
         mock_client = MagicMock()
 
-        captured_reverse = None
-        captured_min_id = None
-
-        async def mock_iter_messages(_chat, **kwargs):
-            nonlocal captured_reverse, captured_min_id
-            captured_reverse = kwargs.get("reverse")
-            captured_min_id = kwargs.get("min_id")
-            return
-            yield
-
-        mock_client.iter_messages = mock_iter_messages
+        captured: dict[str, Any] = {}
+        mock_client.iter_messages = _async_stream_capture(captured)
 
         downloader = MessageDownloader(client=mock_client)
         async for _ in downloader.download_messages(chat="test", reverse=True, min_id=0):
             pass
 
-        assert captured_reverse is True
-        assert captured_min_id == 0
+        assert captured["reverse"] is True
+        assert captured["min_id"] == 0
+
+    async def test_repeated_downloads_pass_same_kwargs(self) -> None:
+        """
+        GIVEN two downloads with identical options, then one with different options
+        WHEN each calls iter_messages
+        THEN repeated options produce the same kwargs and new options are not stale
+        """
+        mock_client = MagicMock()
+        downloader = MessageDownloader(client=mock_client)
+        seen: list[dict[str, Any]] = []
+
+        for min_id in (5, 5, 9):
+            captured: dict[str, Any] = {}
+            mock_client.iter_messages = _async_stream_capture(captured)
+            async for _ in downloader.download_messages(chat="test", reverse=True, min_id=min_id):
+                pass
+            seen.append(captured)
+
+        assert seen[0] == seen[1]
+        assert seen[2]["min_id"] == 9
+
+
+class TestPrefetch:
+    """Test reading ahead of the consumer while it processes messages."""
+
+    pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+    @pytest.mark.real_sleep
+    async def test_download_messages_reads_ahead_of_consumer(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """
+        GIVEN a consumer holding the first message and room to prefetch every batch
+        WHEN the event loop gets a chance to run
+        THEN further messages are pulled from the client meanwhile
+        """
+        monkeypatch.setattr(MessageDownloader, "PREFETCH_SIZE", 5)
+        pulled = 0
+
+        async def iter_messages(*_args: Any, **_kwargs: Any) -> AsyncIterator[Any]:
+            nonlocal pulled
+            for i in range(1, 11):
+                pulled += 1
+                yield _make_msg(i)
+
+        mock_client = MagicMock()
+        mock_client.iter_messages = iter_messages
+
+        downloader = MessageDownloader(client=mock_client, batch_size=2)
+        stream = downloader.download_messages(chat="test")
+        await anext(stream)
+        await asyncio.sleep(0)
+
+        assert pulled == 10
+        await stream.aclose()
+
+    async def test_download_messages_closes_client_stream_on_early_exit(self) -> None:
+        """
+        GIVEN a client stream with more messages than the consumer takes
+        WHEN the consumer stops early and closes the download
+        THEN the client stream is closed too
+        """
+        closed = asyncio.Event()
+
+        async def iter_messages(*_args: Any, **_kwargs: Any) -> AsyncIterator[Any]:
+            try:
+                # More than the prefetcher buffers, so the stream is never exhausted
+                for i in range(1, 1001):
+                    yield _make_msg(i)
+            finally:
+                closed.set()
+
+        mock_client = MagicMock()
+        mock_client.iter_messages = iter_messages
+
+        downloader = MessageDownloader(client=mock_client, batch_size=2)
+        async with aclosing(downloader.download_messages(chat="test")) as stream:
+            await anext(stream)
+
+        assert closed.is_set()
+
+    async def test_download_messages_reraises_client_errors(self) -> None:
+        """
+        GIVEN a client stream that fails partway through
+        WHEN consuming download_messages
+        THEN messages before the failure are yielded, then the error is raised
+        """
+
+        error = ConnectionError("connection lost")
+
+        async def iter_messages(*_args: Any, **_kwargs: Any) -> AsyncIterator[Any]:
+            for i in range(1, 4):
+                yield _make_msg(i)
+            raise error
+
+        mock_client = MagicMock()
+        mock_client.iter_messages = iter_messages
+
+        downloader = MessageDownloader(client=mock_client, batch_size=1)
+        received: list[int] = []
+
+        async def consume() -> None:
+            async for msg in downloader.download_messages(chat="test"):
+                received.append(msg.id)
+
+        with pytest.raises(ConnectionError, match="connection lost"):
+            await consume()
+
+        assert received == [1, 2, 3]
+
+
+class TestDeduplication:
+    """Test suppression of repeated message IDs within a download."""
+
+    pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+    async def test_download_messages_skips_repeated_ids(self) -> None:
+        """
+        GIVEN a stream that repeats message IDs across pages
+        WHEN calling download_messages with the default dedup
+        THEN each ID is yielded once and the repeats don't count toward limit
+        """
+        mock_client = MagicMock()
+        mock_client.iter_messages = _async_stream([_make_msg(i) for i in (1, 2, 2, 3, 1, 4)])
+
+        downloader = MessageDownloader(client=mock_client, batch_size=2)
+        messages = [msg async for msg in downloader.download_messages(chat="test", limit=4)]
+
+        assert [m.id for m in messages] == [1, 2, 3, 4]
+
+    async def test_download_messages_dedup_false_keeps_repeats(self) -> None:
+        """
+        GIVEN a stream that repeats a message ID
+        WHEN calling download_messages with dedup=False
+        THEN every message is yielded as received
+        """
+        mock_client = MagicMock()
+        mock_client.iter_messages = _async_stream([_make_msg(i) for i in (1, 1, 2)])
+
+        downloader = MessageDownloader(client=mock_client)
+        messages = [msg async for msg in downloader.download_messages(chat="test", dedup=False)]
+
+        assert [m.id for m in messages] == [1, 1, 2]
+
+    async def test_download_messages_dedup_cache_is_bounded(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """
+        GIVEN a dedup cache of two IDs
+        WHEN an ID repeats after two newer IDs were seen
+        THEN the evicted ID is yielded again
+        """
+        monkeypatch.setattr(MessageDownloader, "DEDUP_CACHE_SIZE", 2)
+        mock_client = MagicMock()
+        mock_client.iter_messages = _async_stream([_make_msg(i) for i in (1, 2, 3, 1)])
+
+        downloader = MessageDownloader(client=mock_client)
+        messages = [msg async for msg in downloader.download_messages(chat="test")]
+
+        assert [m.id for m in messages] == [1, 2, 3, 1]
+
+
+class TestDownloadAll:
+    """Test MessageDownloader.download_all list-returning download."""
+
+    pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+    async def test_download_all_returns_messages_in_order(self) -> None:
+        """
+        GIVEN a chat with more messages than one batch
+        WHEN calling download_all
+        THEN every message is returned in stream order
+        """
+        mock_client = MagicMock()
+        mock_client.iter_messages = _async_stream([_make_msg(i) for i in range(1, 8)])
+
+        downloader = MessageDownloader(client=mock_client, batch_size=3)
+        messages = await downloader.download_all("test")
+
+        assert [m.id for m in messages] == list(range(1, 8))
+        assert downloader.messages == []
+
+    async def test_download_all_accepts_download_messages_options(self) -> None:
+        """
+        GIVEN limit, store and progress_callback options
+        WHEN calling download_all
+        THEN they behave as they do for download_messages
+        """
+        mock_client = MagicMock()
+        mock_client.iter_messages = _async_stream([_make_msg(i) for i in range(1, 8)])
+        progress = MagicMock()
+
+        downloader = MessageDownloader(client=mock_client, batch_size=3)
+        messages = await downloader.download_all(
+            "test", limit=5, store=True, progress_callback=progress
+        )
+
+        assert [m.id for m in messages] == [1, 2, 3, 4, 5]
+        assert downloader.messages == messages
+        assert progress.call_args_list[-1] == call(5, None)
 
 
 class TestMessageStorage:
     """Test message metadata storage for later processing."""
 
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio(loop_scope="session")
     async def test_downloader_can_store_messages(self) -> None:
         """
         GIVEN a MessageDownloader
@@ -1126,35 +1140,103 @@ class TestMessageStorage:
         """
         mock_client = MagicMock()
 
-        def create_mock_msg(msg_id: int):
-            msg = MagicMock()
-            msg.id = msg_id
-            msg.date = datetime.now(UTC)
-            msg.sender_id = 1001
-            msg.sender = MagicMock()
-            msg.sender.first_name = "Test"
-            msg.sender.last_name = None
-            msg.text = f"Message {msg_id}"
-            msg.reply_to_msg_id = None
-            msg.media = None
-            msg.photo = None
-            msg.video = None
-            msg.audio = None
-            msg.document = None
-            return msg
-
-        async def mock_iter_messages(_chat, **_kwargs):
-            for i in range(3):
-                yield create_mock_msg(i)
-
-        mock_client.iter_messages = mock_iter_messages
+        mock_client.iter_messages = _async_stream([_make_msg(i) for i in range(3)])
 
         downloader = MessageDownloader(client=mock_client)
         async for _ in downloader.download_messages(chat="test", store=True):
             pass
 
         assert len(downloader.messages) == 3
-        assert all(isinstance(m, Message) for m in downloader.messages)
+        for i, stored in enumerate(downloader.messages):
+            _assert_message(stored, id=i)
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_downloader_appends_messages_to_store_path(self, tmp_path: Path) -> None:
+        """
+        GIVEN a MessageDownloader and a store_path
+        WHEN running two downloads with store_path set
+        THEN every message is appended to the file as one JSON line
+        """
+        mock_client = MagicMock()
+        mock_client.iter_messages = _async_stream([_make_msg(i) for i in range(1, 4)])
+        store_path = tmp_path / "messages.jsonl"
+
+        downloader = MessageDownloader(client=mock_client, batch_size=2)
+        for _ in range(2):
+            async for _ in downloader.download_messages(chat="test", store_path=store_path):
+                pass
+
+        lines = store_path.read_text(encoding="utf-8").splitlines()
+        assert [json.loads(line)["id"] for line in lines] == [1, 2, 3, 1, 2, 3]
+        assert dict_to_message(json.loads(lines[0])) == parse_message(_make_msg(1))
+        assert downloader.messages == []
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_downloader_buffers_store_path_writes(
+        self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """
+        GIVEN a download with store_path and a small STORE_FLUSH_BYTES
+        WHEN running it over many batches
+        THEN lines are written in chunks of at least that size, not per message or batch
+        """
+        writes: list[int] = []
+        real_open = aiofiles.open
+
+        async def counting_open(*args: Any, **kwargs: Any) -> Any:
+            store_file = await real_open(*args, **kwargs)
+            real_write = store_file.write
+
+            async def write(data: bytes) -> int:
+                writes.append(len(data))
+                return await real_write(data)
+
+            store_file.write = write
+            return store_file
+
+        monkeypatch.setattr("telegram_getter.downloader.aiofiles.open", counting_open)
+        monkeypatch.setattr(MessageDownloader, "STORE_FLUSH_BYTES", 1024)
+        mock_client = MagicMock()
+        mock_client.iter_messages = _async_stream([_make_msg(i) for i in range(50)])
+        store_path = tmp_path / "messages.jsonl"
+
+        downloader = MessageDownloader(client=mock_client, batch_size=5)
+        async for _ in downloader.download_messages(chat="test", store_path=store_path):
+            pass
+
+        lines = store_path.read_bytes().splitlines()
+        assert len(lines) == 50
+        assert 1 < len(writes) < 10
+        assert all(size >= 1024 for size in writes[:-1])
+        assert sum(writes) == store_path.stat().st_size
+
+    @pytest.mark.parametrize("taken", [1, 2, 3])
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_downloader_records_only_delivered_messages_on_early_exit(
+        self, tmp_path: Path, taken: int
+    ) -> None:
+        """
+        GIVEN a download with store=True and a store_path
+        WHEN the consumer stops after `taken` messages, mid-batch or on a batch boundary
+        THEN once the stream is closed, only the messages it received are stored and written
+        """
+        mock_client = MagicMock()
+        mock_client.iter_messages = _async_stream([_make_msg(i) for i in range(1, 6)])
+        store_path = tmp_path / "messages.jsonl"
+
+        downloader = MessageDownloader(client=mock_client, batch_size=2)
+        received = []
+        async with aclosing(
+            downloader.download_messages(chat="test", store=True, store_path=store_path)
+        ) as stream:
+            async for message in stream:
+                received.append(message)
+                if len(received) == taken:
+                    break
+
+        lines = store_path.read_text(encoding="utf-8").splitlines()
+        assert downloader.messages == received
+        assert [json.loads(line)["id"] for line in lines] == list(range(1, taken + 1))
 
     def test_downloader_messages_initially_empty(self) -> None:
         """
@@ -1168,18 +1250,20 @@ class TestMessageStorage:
 
     def test_downloader_can_clear_stored_messages(self) -> None:
         """
-        GIVEN a MessageDownloader with stored messages
+        GIVEN a MessageDownloader with stored messages and a cached sender name
         WHEN calling clear_messages()
-        THEN stored messages are cleared
+        THEN stored messages and cached sender names are cleared
         """
         mock_client = MagicMock()
         downloader = MessageDownloader(client=mock_client)
+        # Cache a sender name the way a download does
+        parse_message(_FakeTelethonMsg(sender_id=1001), downloader._sender_names)
 
         # Manually add some messages
         downloader.messages.append(
             Message(
                 id=1,
-                date=datetime.now(UTC),
+                date=FIXED_DATE,
                 sender_id=1001,
                 sender_name="Test",
                 text="Hello",
@@ -1187,5 +1271,7 @@ class TestMessageStorage:
         )
 
         assert len(downloader.messages) == 1
+        assert downloader._sender_names == {1001: "Test"}
         downloader.clear_messages()
         assert len(downloader.messages) == 0
+        assert downloader._sender_names == {}
@@ -10,913 +10,499 @@ These tests verify:
 6. Reply-to message handling
 """
 
+import functools
 import json
-from datetime import UTC, datetime
+import re
+import shutil
+import tempfile
+import threading
+from collections.abc import Iterator
+from dataclasses import replace
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
+from typing import Any, AnyStr, cast
 
+import orjson
 import pytest
+from pytest_mock import MockerFixture
 
 from telegram_getter.downloader import Message
 from telegram_getter.exporter import (
+    dict_to_message,
     export_messages_to_json,
     export_to_markdown,
     format_message,
     generate_metadata,
 )
 
+# Keep the module on one xdist worker so the cached exports below are built once
+pytestmark = pytest.mark.xdist_group("exporter")
+
+# Fixed instants shared by the tests below (datetimes are immutable)
+_DT_14_1000 = datetime(2025, 1, 14, 10, 0, 0, tzinfo=UTC)
+_DT_15_1000 = datetime(2025, 1, 15, 10, 0, 0, tzinfo=UTC)
+_DT_15_1430 = datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC)
+_DT_15_143045 = datetime(2025, 1, 15, 14, 30, 45, tzinfo=UTC)
+_DT_15_1431 = datetime(2025, 1, 15, 14, 31, 0, tzinfo=UTC)
+_DT_15_1600 = datetime(2025, 1, 15, 16, 0, 0, tzinfo=UTC)
+_DT_24_0101_1000 = datetime(2024, 1, 1, 10, 0, 0, tzinfo=UTC)
+
+# Fields shared by the format_message cases; each case overrides what it checks
+BASE_MSG_KWARGS: dict[str, Any] = {
+    "id": 1,
+    "date": _DT_15_1430,
+    "sender_id": 1001,
+    "sender_name": "John Doe",
+    "text": "Hello",
+}
+
+# Template message; tests derive variants with dataclasses.replace
+BASE_MSG = Message(**BASE_MSG_KWARGS)
+
+# Second sender's message a minute later, shared read-only by the export fixtures
+JANE_MSG = replace(
+    BASE_MSG, id=2, date=_DT_15_1431, sender_id=1002, sender_name="Jane Smith", text="Hi"
+)
 
-class TestFormatMessageTextOnly:
-    """Test format_message function with text-only messages."""
 
-    def test_format_message_includes_time(self) -> None:
-        """
-        GIVEN a message with a specific time
-        WHEN calling format_message
-        THEN output includes time in HH:MM format
-        """
-        msg = Message(
-            id=1,
-            date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-            sender_id=1001,
-            sender_name="John Doe",
-            text="Hello world",
-        )
+# (media_type, media_path) for the media-count test: two photos, one of each other kind
+_MEDIA_ROWS = [
+    ("photo", "media/images/2025-01-15_001.jpg"),
+    ("audio", "media/audio/2025-01-15_001.ogg"),
+    ("video", "media/video/2025-01-15_001.mp4"),
+    ("document", "media/documents/2025-01-15_001.pdf"),
+    ("photo", "media/images/2025-01-15_002.jpg"),
+]
 
-        result = format_message(msg)
 
-        assert "14:30" in result
+def _assert_order(text: AnyStr, first: AnyStr, second: AnyStr) -> None:
+    """Assert that first occurs in text, followed later by second, in a single forward scan."""
+    start = text.find(first)
+    assert start != -1, f"{first!r} not found"
+    assert text.find(second, start + len(first)) != -1, f"{first!r} does not precede {second!r}"
 
-    def test_format_message_includes_sender_name(self) -> None:
-        """
-        GIVEN a message with sender name
-        WHEN calling format_message
-        THEN output includes sender name
-        """
-        msg = Message(
-            id=1,
-            date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-            sender_id=1001,
-            sender_name="John Doe",
-            text="Hello world",
-        )
 
-        result = format_message(msg)
+def _load_json(path: Path) -> Any:
+    """Parse a JSON file straight from its bytes."""
+    return orjson.loads(path.read_bytes())
 
-        assert "John Doe" in result
 
-    def test_format_message_includes_text(self) -> None:
-        """
-        GIVEN a message with text content
-        WHEN calling format_message
-        THEN output includes the message text
-        """
-        msg = Message(
-            id=1,
-            date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-            sender_id=1001,
-            sender_name="John Doe",
-            text="This is my message content",
-        )
+@pytest.fixture(scope="module")
+def export_dir(tmp_path_factory: pytest.TempPathFactory) -> Iterator[Path]:
+    """
+    Provide one scratch directory for the whole module.
 
-        result = format_message(msg)
+    Uses RAM-backed /dev/shm when the system has it, so export writes skip
+    the disk; otherwise falls back to pytest's temporary directory.
+    """
+    shm = Path("/dev/shm")
+    if not shm.is_dir():
+        yield tmp_path_factory.mktemp("exporter")
+        return
+    base = Path(tempfile.mkdtemp(prefix="telegram-getter-exporter-", dir=shm))
+    try:
+        yield base
+    finally:
+        shutil.rmtree(base, ignore_errors=True)
 
-        assert "This is my message content" in result
 
-    def test_format_message_creates_header_with_time_and_name(self) -> None:
-        """
-        GIVEN a message
-        WHEN calling format_message
-        THEN output has header format "### HH:MM - Sender Name"
-        """
-        msg = Message(
-            id=1,
-            date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-            sender_id=1001,
-            sender_name="John Doe",
-            text="Hello",
-        )
+@pytest.fixture
+def out_dir(export_dir: Path, request: pytest.FixtureRequest) -> Path:
+    """Provide a per-test output directory inside the module's export_dir."""
+    path = export_dir / re.sub(r"\W+", "_", request.node.name)
+    path.mkdir()
+    return path
 
-        result = format_message(msg)
 
-        assert "### 14:30 - John Doe" in result
+_VOICE = {"text": "", "media_type": "audio", "media_path": "media/audio/voice.ogg"}
 
-    def test_format_message_handles_empty_text(self) -> None:
-        """
-        GIVEN a message with empty text
-        WHEN calling format_message
-        THEN output contains header but no extra content lines
-        """
-        msg = Message(
-            id=1,
-            date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-            sender_id=1001,
-            sender_name="John Doe",
-            text="",
-        )
 
-        result = format_message(msg)
+@functools.cache
+def _formatted(**overrides: Any) -> str:
+    """Format BASE_MSG with the given fields replaced, once per distinct set of overrides."""
+    return format_message(replace(BASE_MSG, **overrides))
 
-        # Should have header
-        assert "### 14:30 - John Doe" in result
-        # Should not have content beyond header
-        lines = [line for line in result.strip().split("\n") if line.strip()]
-        assert len(lines) == 1
-
-
-class TestFormatMessageWithMedia:
-    """Test format_message function with media attachments."""
-
-    def test_format_message_with_image_media(self) -> None:
-        """
-        GIVEN a message with image media
-        WHEN calling format_message
-        THEN output includes markdown image link
-        """
-        msg = Message(
-            id=1,
-            date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-            sender_id=1001,
-            sender_name="John Doe",
-            text="Check this out",
-            media_type="photo",
-            media_path="media/images/2025-01-15_001.jpg",
-        )
 
-        result = format_message(msg)
+class TestFormatMessage:
+    """Test format_message function output for text, media, transcription and replies."""
 
-        assert "![image](media/images/2025-01-15_001.jpg)" in result
-
-    def test_format_message_with_audio_media(self) -> None:
+    @pytest.mark.parametrize(
+        ("overrides", "expected"),
+        [
+            pytest.param({}, ["14:30"], id="time"),
+            pytest.param({}, ["John Doe"], id="sender-name"),
+            pytest.param({}, ["### 14:30 - John Doe"], id="header"),
+            pytest.param(
+                {"text": "This is my message content"}, ["This is my message content"], id="text"
+            ),
+            pytest.param(
+                {"media_type": "photo", "media_path": "media/images/2025-01-15_001.jpg"},
+                ["![image](media/images/2025-01-15_001.jpg)"],
+                id="image",
+            ),
+            pytest.param(
+                {"media_type": "audio", "media_path": "media/audio/2025-01-15_001.ogg"},
+                ["[Voice message](media/audio/2025-01-15_001.ogg)"],
+                id="audio",
+            ),
+            pytest.param(
+                {"media_type": "video", "media_path": "media/video/2025-01-15_001.mp4"},
+                ["[Video](media/video/2025-01-15_001.mp4)"],
+                id="video",
+            ),
+            pytest.param(
+                {"media_type": "document", "media_path": "media/documents/2025-01-15_001.pdf"},
+                ["[Document: 2025-01-15_001.pdf](media/documents/2025-01-15_001.pdf)"],
+                id="document",
+            ),
+            pytest.param(
+                {
+                    "text": "",
+                    "media_type": "photo",
+                    "media_path": "media/images/2025-01-15_001.jpg",
+                },
+                ["### 14:30 - John Doe", "![image](media/images/2025-01-15_001.jpg)"],
+                id="media-only",
+            ),
+            pytest.param(
+                {**_VOICE, "transcription": "This is the transcribed voice message"},
+                ["This is the transcribed voice message", "Transcription:"],
+                id="transcription",
+            ),
+            pytest.param(
+                {"id": 2, "reply_to": 1, "text": "Thanks for sharing!"},
+                ["> Replying to message #1"],
+                id="reply",
+            ),
+        ],
+    )
+    def test_format_message_includes(self, overrides: dict[str, Any], expected: list[str]) -> None:
         """
-        GIVEN a message with audio media
+        GIVEN a message with the overridden fields
         WHEN calling format_message
-        THEN output includes audio link
+        THEN output includes each expected fragment
         """
-        msg = Message(
-            id=1,
-            date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-            sender_id=1001,
-            sender_name="John Doe",
-            text="Listen to this",
-            media_type="audio",
-            media_path="media/audio/2025-01-15_001.ogg",
-        )
-
-        result = format_message(msg)
+        result = _formatted(**overrides)
 
-        assert "[Voice message](media/audio/2025-01-15_001.ogg)" in result
+        for fragment in expected:
+            assert fragment in result
 
-    def test_format_message_with_video_media(self) -> None:
+    @pytest.mark.parametrize(
+        ("overrides", "unexpected"),
+        [
+            pytest.param({**_VOICE, "transcription": None}, "Transcription:", id="transcription"),
+            pytest.param({}, "Replying to", id="reply"),
+        ],
+    )
+    def test_format_message_omits(self, overrides: dict[str, Any], unexpected: str) -> None:
         """
-        GIVEN a message with video media
+        GIVEN a message without a transcription or reply
         WHEN calling format_message
-        THEN output includes video link
+        THEN output has no section for it
         """
-        msg = Message(
-            id=1,
-            date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-            sender_id=1001,
-            sender_name="John Doe",
-            text="Watch this",
-            media_type="video",
-            media_path="media/video/2025-01-15_001.mp4",
-        )
+        result = _formatted(**overrides)
 
-        result = format_message(msg)
+        assert unexpected not in result
 
-        assert "[Video](media/video/2025-01-15_001.mp4)" in result
-
-    def test_format_message_with_document_media(self) -> None:
+    @pytest.mark.parametrize(
+        ("overrides", "first", "second"),
+        [
+            pytest.param(
+                {**_VOICE, "transcription": "Hello from voice"},
+                "[Voice message]",
+                "Hello from voice",
+                id="media-before-transcription",
+            ),
+            pytest.param(
+                {"id": 2, "reply_to": 1, "text": "Thanks!"},
+                "> Replying to message #1",
+                "Thanks!",
+                id="reply-before-text",
+            ),
+        ],
+    )
+    def test_format_message_orders_sections(
+        self, overrides: dict[str, Any], first: str, second: str
+    ) -> None:
         """
-        GIVEN a message with document media
+        GIVEN a message with a media link or reply indicator
         WHEN calling format_message
-        THEN output includes document link with filename
+        THEN it appears before the transcription or text
         """
-        msg = Message(
-            id=1,
-            date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-            sender_id=1001,
-            sender_name="John Doe",
-            text="Here's the file",
-            media_type="document",
-            media_path="media/documents/2025-01-15_001.pdf",
-        )
-
-        result = format_message(msg)
+        result = _formatted(**overrides)
 
-        assert "[Document: 2025-01-15_001.pdf](media/documents/2025-01-15_001.pdf)" in result
+        _assert_order(result, first, second)
 
-    def test_format_message_media_only_no_text(self) -> None:
+    def test_format_message_handles_empty_text(self) -> None:
         """
-        GIVEN a message with media but no text
+        GIVEN a message with empty text
         WHEN calling format_message
-        THEN output includes header and media link
+        THEN output contains header but no extra content lines
         """
-        msg = Message(
-            id=1,
-            date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-            sender_id=1001,
-            sender_name="John Doe",
-            text="",
-            media_type="photo",
-            media_path="media/images/2025-01-15_001.jpg",
-        )
-
-        result = format_message(msg)
+        result = _formatted(text="")
 
+        # Should have header
         assert "### 14:30 - John Doe" in result
-        assert "![image](media/images/2025-01-15_001.jpg)" in result
-
-
-class TestFormatMessageWithTranscription:
-    """Test format_message function with transcription field."""
-
-    def test_format_message_with_transcription(self) -> None:
-        """
-        GIVEN a voice message with transcription
-        WHEN calling format_message
-        THEN output includes transcription text
-        """
-        msg = Message(
-            id=1,
-            date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-            sender_id=1001,
-            sender_name="John Doe",
-            text="",
-            media_type="audio",
-            media_path="media/audio/voice.ogg",
-            transcription="This is the transcribed voice message",
-        )
-
-        result = format_message(msg)
-
-        assert "This is the transcribed voice message" in result
-
-    def test_format_message_transcription_appears_after_media_link(self) -> None:
-        """
-        GIVEN a voice message with transcription
-        WHEN calling format_message
-        THEN transcription appears after the voice message link
-        """
-        msg = Message(
-            id=1,
-            date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-            sender_id=1001,
-            sender_name="John Doe",
-            text="",
-            media_type="audio",
-            media_path="media/audio/voice.ogg",
-            transcription="Hello from voice",
-        )
-
-        result = format_message(msg)
-
-        media_pos = result.find("[Voice message]")
-        transcription_pos = result.find("Hello from voice")
-
-        assert media_pos < transcription_pos
-
-    def test_format_message_transcription_format(self) -> None:
-        """
-        GIVEN a voice message with transcription
-        WHEN calling format_message
-        THEN transcription is formatted with speaker icon indicator
-        """
-        msg = Message(
-            id=1,
-            date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-            sender_id=1001,
-            sender_name="John Doe",
-            text="",
-            media_type="audio",
-            media_path="media/audio/voice.ogg",
-            transcription="Test transcription",
-        )
-
-        result = format_message(msg)
-
-        # Should include a transcription indicator
-        assert "Transcription:" in result
-
-    def test_format_message_without_transcription(self) -> None:
-        """
-        GIVEN a voice message without transcription
-        WHEN calling format_message
-        THEN output does not include transcription section
-        """
-        msg = Message(
-            id=1,
-            date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-            sender_id=1001,
-            sender_name="John Doe",
-            text="",
-            media_type="audio",
-            media_path="media/audio/voice.ogg",
-            transcription=None,
-        )
-
-        result = format_message(msg)
-
-        assert "Transcription:" not in result
-
-
-class TestFormatMessageWithReply:
-
-    def test_format_message_with_reply_to(self) -> None:
-        """
-        GIVEN a message that is a reply
-        WHEN calling format_message
-        THEN output includes "Replying to message #ID"
-        """
-        msg = Message(
-            id=2,
-            date=datetime(2025, 1, 15, 14, 31, 0, tzinfo=UTC),
-            sender_id=1002,
-            sender_name="Jane Smith",
-            text="Thanks for sharing!",
-            reply_to=1,
-        )
-
-        result = format_message(msg)
-
-        assert "> Replying to message #1" in result
-
-    def test_format_message_reply_appears_before_text(self) -> None:
-        """
-        GIVEN a message that is a reply with text
-        WHEN calling format_message
-        THEN reply indicator appears before the message text
-        """
-        msg = Message(
-            id=2,
-            date=datetime(2025, 1, 15, 14, 31, 0, tzinfo=UTC),
-            sender_id=1002,
-            sender_name="Jane Smith",
-            text="Thanks!",
-            reply_to=1,
-        )
-
-        result = format_message(msg)
-
-        reply_pos = result.find("> Replying to message #1")
-        text_pos = result.find("Thanks!")
+        # Should not have content beyond header
+        lines = [line for line in result.strip().split("\n") if line.strip()]
+        assert len(lines) == 1
 
-        assert reply_pos < text_pos
 
-    def test_format_message_without_reply(self) -> None:
-        """
-        GIVEN a message that is not a reply
-        WHEN calling format_message
-        THEN output does not include reply indicator
-        """
-        msg = Message(
-            id=1,
-            date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-            sender_id=1001,
-            sender_name="John Doe",
-            text="Hello",
+async def _export_markdown(
+    output_dir: Path, messages: list[Message], chat_name: str
+) -> tuple[Path, bytes]:
+    """Export messages once into output_dir and return the file and its raw bytes."""
+    path = await export_to_markdown(messages, chat_name, output_dir)
+    # Expected fragments are ASCII, so search the bytes without decoding the file
+    return path, path.read_bytes()
+
+
+@pytest.fixture(scope="module")
+async def single_day_export(export_dir: Path) -> tuple[Path, bytes]:
+    """Export two messages from one day, one of them with a photo, as "Work Team"."""
+    messages = [
+        replace(
+            BASE_MSG, text="Photo", media_type="photo", media_path="media/images/2025-01-15_001.jpg"
+        ),
+        JANE_MSG,
+    ]
+    return await _export_markdown(export_dir / "single_day", messages, "Work Team")
+
+
+@pytest.fixture(scope="module")
+async def multi_day_export(export_dir: Path) -> tuple[Path, bytes]:
+    """Export out-of-order messages spread over two days."""
+    messages = [
+        replace(BASE_MSG, date=_DT_15_1600, sender_id=1002, sender_name="Jane", text="Later"),
+        replace(
+            BASE_MSG, id=2, date=_DT_14_1000, sender_id=1002, sender_name="Jane Smith", text="Day 2"
+        ),
+        replace(BASE_MSG, id=3, date=_DT_15_1000, sender_name="John", text="Earlier"),
+    ]
+    return await _export_markdown(export_dir / "multi_day", messages, "Test Chat")
+
+
+@pytest.fixture(scope="module")
+async def empty_export(export_dir: Path) -> tuple[Path, bytes]:
+    """Export an empty message list as "Empty Chat"."""
+    return await _export_markdown(export_dir / "empty", [], "Empty Chat")
+
+
+_MARKDOWN_FRAGMENTS = [
+    pytest.param("single_day_export", b"# Chat: Work Team", id="chat-name"),
+    pytest.param("single_day_export", b"Downloaded:", id="download-date"),
+    pytest.param("single_day_export", b"Total messages: 2", id="total-messages"),
+    pytest.param("single_day_export", b"Media files: 1", id="media-count"),
+    pytest.param("multi_day_export", b"## 2025-01-15", id="date-header-15"),
+    pytest.param("multi_day_export", b"## 2025-01-14", id="date-header-14"),
+    pytest.param("multi_day_export", b"---", id="date-separator"),
+    pytest.param("empty_export", b"# Chat: Empty Chat", id="empty-chat-name"),
+    pytest.param("empty_export", b"Total messages: 0", id="empty-total"),
+]
+
+# Every expected fragment in one alternation, so each export is scanned once
+_MARKDOWN_FRAGMENT_RE = re.compile(
+    b"|".join(
+        re.escape(fragment)
+        for fragment in sorted(
+            {cast("bytes", p.values[1]) for p in _MARKDOWN_FRAGMENTS}, key=len, reverse=True
         )
+    )
+)
 
-        result = format_message(msg)
 
-        assert "Replying to" not in result
+@functools.cache
+def _markdown_fragments_in(content: bytes) -> frozenset[bytes]:
+    """Return which expected fragments occur in an exported markdown text."""
+    return frozenset(_MARKDOWN_FRAGMENT_RE.findall(content))
 
 
 class TestExportToMarkdown:
     """Test export_to_markdown function for creating markdown files."""
 
-    @pytest.mark.asyncio
-    async def test_export_to_markdown_creates_file(self, tmp_path: Path) -> None:
+    @pytest.mark.parametrize("export", ["single_day_export", "empty_export"])
+    def test_export_to_markdown_creates_file(
+        self, request: pytest.FixtureRequest, export: str
+    ) -> None:
         """
-        GIVEN a list of messages
+        GIVEN a list of messages, possibly empty
         WHEN calling export_to_markdown
         THEN creates messages.md file in output directory
         """
-        messages = [
-            Message(
-                id=1,
-                date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John Doe",
-                text="Hello",
-            )
-        ]
-
-        result = await export_to_markdown(messages, "Test Chat", tmp_path)
-
-        assert result.exists()
-        assert result.name == "messages.md"
-
-    @pytest.mark.asyncio
-    async def test_export_to_markdown_includes_chat_name(self, tmp_path: Path) -> None:
-        """
-        GIVEN a chat name
-        WHEN calling export_to_markdown
-        THEN output includes "# Chat: {name}" header
-        """
-        messages = [
-            Message(
-                id=1,
-                date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John Doe",
-                text="Hello",
-            )
-        ]
-
-        result = await export_to_markdown(messages, "Work Team", tmp_path)
-
-        content = result.read_text()
-        assert "# Chat: Work Team" in content
-
-    @pytest.mark.asyncio
-    async def test_export_to_markdown_includes_download_date(self, tmp_path: Path) -> None:
-        """
-        GIVEN messages to export
-        WHEN calling export_to_markdown
-        THEN output includes download timestamp
-        """
-        messages = [
-            Message(
-                id=1,
-                date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John Doe",
-                text="Hello",
-            )
-        ]
-
-        result = await export_to_markdown(messages, "Test Chat", tmp_path)
-
-        content = result.read_text()
-        assert "Downloaded:" in content
-
-    @pytest.mark.asyncio
-    async def test_export_to_markdown_includes_total_messages(self, tmp_path: Path) -> None:
-        """
-        GIVEN multiple messages
-        WHEN calling export_to_markdown
-        THEN output includes total message count
-        """
-        messages = [
-            Message(
-                id=1,
-                date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John Doe",
-                text="Hello",
-            ),
-            Message(
-                id=2,
-                date=datetime(2025, 1, 15, 14, 31, 0, tzinfo=UTC),
-                sender_id=1002,
-                sender_name="Jane Smith",
-                text="Hi",
-            ),
-        ]
-
-        result = await export_to_markdown(messages, "Test Chat", tmp_path)
-
-        content = result.read_text()
-        assert "Total messages: 2" in content
-
-    @pytest.mark.asyncio
-    async def test_export_to_markdown_includes_media_count(self, tmp_path: Path) -> None:
-        """
-        GIVEN messages with media
-        WHEN calling export_to_markdown
-        THEN output includes media file count
-        """
-        messages = [
-            Message(
-                id=1,
-                date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John Doe",
-                text="Photo",
-                media_type="photo",
-                media_path="media/images/2025-01-15_001.jpg",
-            ),
-            Message(
-                id=2,
-                date=datetime(2025, 1, 15, 14, 31, 0, tzinfo=UTC),
-                sender_id=1002,
-                sender_name="Jane Smith",
-                text="Hi",
-            ),
-        ]
-
-        result = await export_to_markdown(messages, "Test Chat", tmp_path)
-
-        content = result.read_text()
-        assert "Media files: 1" in content
-
-    @pytest.mark.asyncio
-    async def test_export_to_markdown_groups_by_date(self, tmp_path: Path) -> None:
-        """
-        GIVEN messages from different dates
-        WHEN calling export_to_markdown
-        THEN output groups messages by date with "## YYYY-MM-DD" headers
-        """
-        messages = [
-            Message(
-                id=1,
-                date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John Doe",
-                text="Day 1",
-            ),
-            Message(
-                id=2,
-                date=datetime(2025, 1, 14, 10, 0, 0, tzinfo=UTC),
-                sender_id=1002,
-                sender_name="Jane Smith",
-                text="Day 2",
-            ),
-        ]
-
-        result = await export_to_markdown(messages, "Test Chat", tmp_path)
-
-        content = result.read_text()
-        assert "## 2025-01-15" in content
-        assert "## 2025-01-14" in content
-
-    @pytest.mark.asyncio
-    async def test_export_to_markdown_sorts_dates_oldest_first(self, tmp_path: Path) -> None:
-        """
-        GIVEN messages from different dates
-        WHEN calling export_to_markdown
-        THEN dates are sorted oldest first (chronological order)
-        """
-        messages = [
-            Message(
-                id=1,
-                date=datetime(2025, 1, 14, 10, 0, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John Doe",
-                text="Old",
-            ),
-            Message(
-                id=2,
-                date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-                sender_id=1002,
-                sender_name="Jane Smith",
-                text="New",
-            ),
-        ]
-
-        result = await export_to_markdown(messages, "Test Chat", tmp_path)
+        path, _ = request.getfixturevalue(export)
 
-        content = result.read_text()
-        pos_jan_14 = content.find("## 2025-01-14")
-        pos_jan_15 = content.find("## 2025-01-15")
+        assert path.exists()
+        assert path.name == "messages.md"
 
-        # Oldest date should appear first (chronological order)
-        assert pos_jan_14 < pos_jan_15
-
-    @pytest.mark.asyncio
-    async def test_export_to_markdown_sorts_messages_by_time_within_date(
-        self, tmp_path: Path
+    @pytest.mark.parametrize(("export", "fragment"), _MARKDOWN_FRAGMENTS)
+    def test_export_to_markdown_includes(
+        self, request: pytest.FixtureRequest, export: str, fragment: bytes
     ) -> None:
         """
-        GIVEN multiple messages on same date
-        WHEN calling export_to_markdown
-        THEN messages are sorted by time (earliest first)
+        GIVEN an exported chat
+        WHEN reading the markdown file
+        THEN it includes the expected header, summary or date section
         """
-        messages = [
-            Message(
-                id=2,
-                date=datetime(2025, 1, 15, 16, 0, 0, tzinfo=UTC),
-                sender_id=1002,
-                sender_name="Jane",
-                text="Later",
-            ),
-            Message(
-                id=1,
-                date=datetime(2025, 1, 15, 10, 0, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John",
-                text="Earlier",
-            ),
-        ]
-
-        result = await export_to_markdown(messages, "Test Chat", tmp_path)
+        _, content = request.getfixturevalue(export)
 
-        content = result.read_text()
-        pos_earlier = content.find("Earlier")
-        pos_later = content.find("Later")
+        assert fragment in _markdown_fragments_in(content)
 
-        assert pos_earlier < pos_later
-
-    @pytest.mark.asyncio
-    async def test_export_to_markdown_includes_separator_between_dates(
-        self, tmp_path: Path
+    @pytest.mark.parametrize(
+        ("first", "second"),
+        [
+            pytest.param(b"## 2025-01-14", b"## 2025-01-15", id="dates-oldest-first"),
+            pytest.param(b"Earlier", b"Later", id="times-within-date"),
+        ],
+    )
+    def test_export_to_markdown_sorts_chronologically(
+        self, multi_day_export: tuple[Path, bytes], first: bytes, second: bytes
     ) -> None:
         """
-        GIVEN messages from multiple dates
+        GIVEN messages from different dates and times, out of order
         WHEN calling export_to_markdown
-        THEN dates are separated by horizontal rules
+        THEN dates and messages within a date appear oldest first
         """
-        messages = [
-            Message(
-                id=1,
-                date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John Doe",
-                text="Day 1",
-            ),
-            Message(
-                id=2,
-                date=datetime(2025, 1, 14, 10, 0, 0, tzinfo=UTC),
-                sender_id=1002,
-                sender_name="Jane Smith",
-                text="Day 2",
-            ),
-        ]
+        _, content = multi_day_export
 
-        result = await export_to_markdown(messages, "Test Chat", tmp_path)
-
-        content = result.read_text()
-        assert "---" in content
-
-    @pytest.mark.asyncio
-    async def test_export_to_markdown_empty_messages(self, tmp_path: Path) -> None:
-        """
-        GIVEN an empty message list
-        WHEN calling export_to_markdown
-        THEN creates file with header only
-        """
-        messages: list[Message] = []
+        _assert_order(content, first, second)
 
-        result = await export_to_markdown(messages, "Empty Chat", tmp_path)
 
-        assert result.exists()
-        content = result.read_text()
-        assert "# Chat: Empty Chat" in content
-        assert "Total messages: 0" in content
+@pytest.fixture(scope="module")
+async def group_metadata(export_dir: Path) -> tuple[Path, Any]:
+    """Generate metadata once for a two-message group chat and parse it."""
+    messages = [
+        BASE_MSG,
+        JANE_MSG,
+    ]
+    path = await generate_metadata(
+        messages, "Work Team", 123456789, "group", export_dir / "group_metadata"
+    )
+    return path, _load_json(path)
 
 
 class TestGenerateMetadata:
     """Test generate_metadata function for creating metadata.json."""
 
-    @pytest.mark.asyncio
-    async def test_generate_metadata_creates_file(self, tmp_path: Path) -> None:
+    def test_generate_metadata_creates_file(self, group_metadata: tuple[Path, Any]) -> None:
         """
         GIVEN messages and chat info
         WHEN calling generate_metadata
         THEN creates metadata.json file
         """
-        messages = [
-            Message(
-                id=1,
-                date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John Doe",
-                text="Hello",
-            )
-        ]
-
-        result = await generate_metadata(
-            messages, "Work Team", 123456789, "group", tmp_path
-        )
-
-        assert result.exists()
-        assert result.name == "metadata.json"
-
-    @pytest.mark.asyncio
-    async def test_generate_metadata_includes_chat_name(self, tmp_path: Path) -> None:
-        """
-        GIVEN a chat name
-        WHEN calling generate_metadata
-        THEN JSON includes chat_name field
-        """
-        messages = [
-            Message(
-                id=1,
-                date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John Doe",
-                text="Hello",
-            )
-        ]
-
-        result = await generate_metadata(
-            messages, "Work Team", 123456789, "group", tmp_path
-        )
-
-        data = json.loads(result.read_text())
-        assert data["chat_name"] == "Work Team"
-
-    @pytest.mark.asyncio
-    async def test_generate_metadata_includes_chat_id(self, tmp_path: Path) -> None:
-        """
-        GIVEN a chat id
-        WHEN calling generate_metadata
-        THEN JSON includes chat_id field
-        """
-        messages = [
-            Message(
-                id=1,
-                date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John Doe",
-                text="Hello",
-            )
-        ]
-
-        result = await generate_metadata(
-            messages, "Work Team", 123456789, "group", tmp_path
-        )
-
-        data = json.loads(result.read_text())
-        assert data["chat_id"] == 123456789
-
-    @pytest.mark.asyncio
-    async def test_generate_metadata_includes_chat_type(self, tmp_path: Path) -> None:
+        path, _ = group_metadata
+
+        assert path.exists()
+        assert path.name == "metadata.json"
+
+    @pytest.mark.parametrize(
+        ("key", "expected"),
+        [
+            pytest.param("chat_name", "Work Team", id="chat-name"),
+            pytest.param("chat_id", 123456789, id="chat-id"),
+            pytest.param("chat_type", "group", id="chat-type"),
+            pytest.param("total_messages", 2, id="total-messages"),
+        ],
+    )
+    def test_generate_metadata_includes_field(
+        self, group_metadata: tuple[Path, Any], key: str, expected: Any
+    ) -> None:
         """
-        GIVEN a chat type
+        GIVEN chat info and messages
         WHEN calling generate_metadata
-        THEN JSON includes chat_type field
+        THEN JSON includes the field with the given value
         """
-        messages = [
-            Message(
-                id=1,
-                date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John Doe",
-                text="Hello",
-            )
-        ]
-
-        result = await generate_metadata(
-            messages, "Work Team", 123456789, "channel", tmp_path
-        )
+        _, data = group_metadata
 
-        data = json.loads(result.read_text())
-        assert data["chat_type"] == "channel"
+        assert data[key] == expected
 
-    @pytest.mark.asyncio
-    async def test_generate_metadata_includes_download_timestamp(
-        self, tmp_path: Path
+    def test_generate_metadata_includes_download_timestamp(
+        self, group_metadata: tuple[Path, Any]
     ) -> None:
         """
         GIVEN messages to export
         WHEN calling generate_metadata
         THEN JSON includes downloaded_at timestamp
         """
-        messages = [
-            Message(
-                id=1,
-                date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John Doe",
-                text="Hello",
-            )
-        ]
+        _, data = group_metadata
 
-        result = await generate_metadata(
-            messages, "Work Team", 123456789, "group", tmp_path
-        )
-
-        data = json.loads(result.read_text())
         assert "downloaded_at" in data
         # Should be ISO format
         assert "T" in data["downloaded_at"]
 
-    @pytest.mark.asyncio
-    async def test_generate_metadata_includes_total_messages(
-        self, tmp_path: Path
-    ) -> None:
+    def test_generate_metadata_is_valid_json(self, group_metadata: tuple[Path, Any]) -> None:
         """
-        GIVEN multiple messages
+        GIVEN messages
         WHEN calling generate_metadata
-        THEN JSON includes total_messages count
+        THEN output file is valid JSON
         """
-        messages = [
-            Message(
-                id=1,
-                date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John Doe",
-                text="Hello",
-            ),
-            Message(
-                id=2,
-                date=datetime(2025, 1, 15, 14, 31, 0, tzinfo=UTC),
-                sender_id=1002,
-                sender_name="Jane Smith",
-                text="Hi",
-            ),
-        ]
+        path, _ = group_metadata
 
-        result = await generate_metadata(
-            messages, "Work Team", 123456789, "group", tmp_path
-        )
+        # Should not raise; parsed with stdlib json as a check independent of orjson
+        data = json.loads(path.read_text())
+        assert isinstance(data, dict)
 
-        data = json.loads(result.read_text())
-        assert data["total_messages"] == 2
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_generate_metadata_includes_chat_type(self, out_dir: Path) -> None:
+        """
+        GIVEN a chat type
+        WHEN calling generate_metadata
+        THEN JSON includes chat_type field
+        """
+        messages = [BASE_MSG]
+
+        result = await generate_metadata(messages, "Work Team", 123456789, "channel", out_dir)
 
-    @pytest.mark.asyncio
-    async def test_generate_metadata_counts_media_by_type(self, tmp_path: Path) -> None:
+        data = _load_json(result)
+        assert data["chat_type"] == "channel"
+
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_generate_metadata_counts_media_by_type(self, out_dir: Path) -> None:
         """
         GIVEN messages with different media types
         WHEN calling generate_metadata
         THEN JSON includes media_files breakdown by type
         """
         messages = [
-            Message(
-                id=1,
-                date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John",
-                text="Photo",
-                media_type="photo",
-                media_path="media/images/2025-01-15_001.jpg",
-            ),
-            Message(
-                id=2,
-                date=datetime(2025, 1, 15, 14, 31, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John",
-                text="Audio",
-                media_type="audio",
-                media_path="media/audio/2025-01-15_001.ogg",
-            ),
-            Message(
-                id=3,
-                date=datetime(2025, 1, 15, 14, 32, 0, tzinfo=UTC),
-                sender_id=1001,
+            replace(
+                BASE_MSG,
+                id=i,
+                date=_DT_15_1430 + timedelta(minutes=i - 1),
                 sender_name="John",
-                text="Video",
-                media_type="video",
-                media_path="media/video/2025-01-15_001.mp4",
-            ),
-            Message(
-                id=4,
-                date=datetime(2025, 1, 15, 14, 33, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John",
-                text="Doc",
-                media_type="document",
-                media_path="media/documents/2025-01-15_001.pdf",
-            ),
-            Message(
-                id=5,
-                date=datetime(2025, 1, 15, 14, 34, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John",
-                text="Another photo",
-                media_type="photo",
-                media_path="media/images/2025-01-15_002.jpg",
-            ),
+                text=media_type,
+                media_type=media_type,
+                media_path=media_path,
+            )
+            for i, (media_type, media_path) in enumerate(_MEDIA_ROWS, start=1)
         ]
 
-        result = await generate_metadata(
-            messages, "Work Team", 123456789, "group", tmp_path
-        )
+        result = await generate_metadata(messages, "Work Team", 123456789, "group", out_dir)
 
-        data = json.loads(result.read_text())
+        data = _load_json(result)
         assert data["media_files"]["images"] == 2
         assert data["media_files"]["audio"] == 1
         assert data["media_files"]["video"] == 1
         assert data["media_files"]["documents"] == 1
 
-    @pytest.mark.asyncio
-    async def test_generate_metadata_includes_date_range(self, tmp_path: Path) -> None:
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_generate_metadata_includes_date_range(self, out_dir: Path) -> None:
         """
         GIVEN messages spanning multiple dates
         WHEN calling generate_metadata
         THEN JSON includes date_range with from and to
         """
         messages = [
-            Message(
-                id=1,
-                date=datetime(2024, 1, 1, 10, 0, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John",
-                text="Start",
-            ),
-            Message(
-                id=2,
-                date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John",
-                text="End",
-            ),
+            replace(BASE_MSG, date=_DT_24_0101_1000, sender_name="John", text="Start"),
+            replace(BASE_MSG, id=2, sender_name="John", text="End"),
         ]
 
-        result = await generate_metadata(
-            messages, "Work Team", 123456789, "group", tmp_path
-        )
+        result = await generate_metadata(messages, "Work Team", 123456789, "group", out_dir)
 
-        data = json.loads(result.read_text())
+        data = _load_json(result)
         assert data["date_range"]["from"] == "2024-01-01"
         assert data["date_range"]["to"] == "2025-01-15"
 
-    @pytest.mark.asyncio
-    async def test_generate_metadata_handles_empty_messages(
-        self, tmp_path: Path
-    ) -> None:
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_generate_metadata_handles_empty_messages(self, out_dir: Path) -> None:
         """
         GIVEN an empty message list
         WHEN calling generate_metadata
@@ -924,117 +510,91 @@ class TestGenerateMetadata:
         """
         messages: list[Message] = []
 
-        result = await generate_metadata(
-            messages, "Empty Chat", 123456789, "group", tmp_path
-        )
-
-        data = json.loads(result.read_text())
-        assert data["total_messages"] == 0
-        assert data["media_files"]["images"] == 0
-        assert data["media_files"]["audio"] == 0
-        assert data["media_files"]["video"] == 0
-        assert data["media_files"]["documents"] == 0
-        assert data["date_range"]["from"] is None
-        assert data["date_range"]["to"] is None
-
-    @pytest.mark.asyncio
-    async def test_generate_metadata_is_valid_json(self, tmp_path: Path) -> None:
-        """
-        GIVEN messages
-        WHEN calling generate_metadata
-        THEN output file is valid JSON
-        """
-        messages = [
-            Message(
-                id=1,
-                date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John Doe",
-                text="Hello",
-            )
-        ]
-
-        result = await generate_metadata(
-            messages, "Work Team", 123456789, "group", tmp_path
-        )
+        result = await generate_metadata(messages, "Empty Chat", 123456789, "group", out_dir)
 
-        # Should not raise
-        data = json.loads(result.read_text())
-        assert isinstance(data, dict)
+        data = _load_json(result)
+        # One comparison against the full document, so unexpected keys fail too
+        assert data == {
+            "chat_name": "Empty Chat",
+            "chat_id": 123456789,
+            "chat_type": "group",
+            "downloaded_at": data["downloaded_at"],
+            "total_messages": 0,
+            "media_files": {"images": 0, "audio": 0, "video": 0, "documents": 0},
+            "date_range": {"from": None, "to": None},
+        }
 
 
 class TestExportMessagesToJson:
     """Test export_messages_to_json function for creating messages.json."""
 
-    @pytest.mark.asyncio
-    async def test_export_messages_to_json_creates_file(self, tmp_path: Path) -> None:
+    pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+    async def test_export_messages_to_json_creates_file(self, out_dir: Path) -> None:
         """
         GIVEN a list of messages
         WHEN calling export_messages_to_json
         THEN creates messages.json file in output directory
         """
-        messages = [
-            Message(
-                id=1,
-                date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John Doe",
-                text="Hello",
-            )
-        ]
+        messages = [BASE_MSG]
 
-        result = await export_messages_to_json(messages, tmp_path)
+        result = await export_messages_to_json(messages, out_dir)
 
         assert result.exists()
         assert result.name == "messages.json"
 
-    @pytest.mark.asyncio
-    async def test_export_messages_to_json_chronological_order(
-        self, tmp_path: Path
+    async def test_export_messages_to_json_encodes_off_event_loop(
+        self, out_dir: Path, mocker: MockerFixture
     ) -> None:
+        """
+        GIVEN a list of messages
+        WHEN calling export_messages_to_json
+        THEN the JSON is encoded in a worker thread, not on the event loop thread
+        """
+        encoding_threads: list[int] = []
+        dumps = orjson.dumps
+
+        def recording_dumps(*args: Any, **kwargs: Any) -> bytes:
+            encoding_threads.append(threading.get_ident())
+            return dumps(*args, **kwargs)
+
+        mocker.patch("telegram_getter.exporter.orjson.dumps", side_effect=recording_dumps)
+
+        await export_messages_to_json([BASE_MSG], out_dir)
+
+        assert encoding_threads
+        assert threading.get_ident() not in encoding_threads
+
+    async def test_export_messages_to_json_chronological_order(self, out_dir: Path) -> None:
         """
         GIVEN messages in non-chronological order
         WHEN calling export_messages_to_json
         THEN messages are sorted oldest first (chronological order)
         """
         messages = [
-            Message(
-                id=2,
-                date=datetime(2025, 1, 15, 16, 0, 0, tzinfo=UTC),
-                sender_id=1002,
-                sender_name="Jane",
-                text="Later",
-            ),
-            Message(
-                id=1,
-                date=datetime(2025, 1, 14, 10, 0, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John",
-                text="Earlier",
+            replace(
+                BASE_MSG, id=2, date=_DT_15_1600, sender_id=1002, sender_name="Jane", text="Later"
             ),
+            replace(BASE_MSG, date=_DT_14_1000, sender_name="John", text="Earlier"),
         ]
 
-        result = await export_messages_to_json(messages, tmp_path)
+        result = await export_messages_to_json(messages, out_dir)
 
-        data = json.loads(result.read_text())
+        data = _load_json(result)
         assert data["messages"][0]["id"] == 1  # Earlier message first
         assert data["messages"][1]["id"] == 2  # Later message second
 
-    @pytest.mark.asyncio
-    async def test_export_messages_to_json_includes_all_fields(
-        self, tmp_path: Path
-    ) -> None:
+    async def test_export_messages_to_json_includes_all_fields(self, out_dir: Path) -> None:
         """
         GIVEN a message with all fields populated
         WHEN calling export_messages_to_json
         THEN all fields are included in the JSON output
         """
         messages = [
-            Message(
+            replace(
+                BASE_MSG,
                 id=123,
-                date=datetime(2025, 1, 15, 14, 30, 45, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John Doe",
+                date=_DT_15_143045,
                 text="Hello world",
                 reply_to=100,
                 media_type="photo",
@@ -1042,9 +602,9 @@ class TestExportMessagesToJson:
             )
         ]
 
-        result = await export_messages_to_json(messages, tmp_path)
+        result = await export_messages_to_json(messages, out_dir)
 
-        data = json.loads(result.read_text())
+        data = _load_json(result)
         msg = data["messages"][0]
 
         assert msg["id"] == 123
@@ -1056,67 +616,86 @@ class TestExportMessagesToJson:
         assert msg["media_type"] == "photo"
         assert msg["media_path"] == "media/images/photo.jpg"
 
-    @pytest.mark.asyncio
-    async def test_export_messages_to_json_includes_message_count(
-        self, tmp_path: Path
+    async def test_export_messages_to_json_entries_round_trip(self, out_dir: Path) -> None:
+        """
+        GIVEN messages with microsecond dates, non-ASCII text and a transcription
+        WHEN calling export_messages_to_json
+        THEN each exported entry reads back through dict_to_message as the same message
+        """
+        messages = [
+            replace(BASE_MSG, date=_DT_15_1430.replace(microsecond=123456), text="Привет 👋"),
+            replace(
+                BASE_MSG,
+                id=2,
+                date=_DT_15_1431,
+                media_type="audio",
+                media_path="media/audio/voice.ogg",
+                transcription="Voice text",
+            ),
+        ]
+
+        result = await export_messages_to_json(messages, out_dir)
+
+        data = _load_json(result)
+        assert [dict_to_message(d) for d in data["messages"]] == messages
+
+    async def test_export_messages_to_json_streams_large_exports_in_same_layout(
+        self, out_dir: Path, monkeypatch: pytest.MonkeyPatch
     ) -> None:
+        """
+        GIVEN more messages than the export chunk size, in reverse order
+        WHEN calling export_messages_to_json
+        THEN the chunked file holds every message in order, in the single-write layout
+        """
+        monkeypatch.setattr("telegram_getter.exporter._JSON_CHUNK_SIZE", 2)
+        messages = [
+            replace(BASE_MSG, id=i, date=_DT_15_1430 + timedelta(minutes=i), text=f"Line\n{i}")
+            for i in range(5, 0, -1)
+        ]
+
+        result = await export_messages_to_json(messages, out_dir)
+
+        raw = result.read_bytes()
+        data = orjson.loads(raw)
+        assert data["message_count"] == 5
+        assert [dict_to_message(d) for d in data["messages"]] == messages[::-1]
+        # Re-encoding the parsed document reproduces the file byte for byte
+        assert raw == orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+
+    async def test_export_messages_to_json_includes_message_count(self, out_dir: Path) -> None:
         """
         GIVEN multiple messages
         WHEN calling export_messages_to_json
         THEN JSON includes message_count field
         """
         messages = [
-            Message(
-                id=1,
-                date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John",
-                text="First",
-            ),
-            Message(
-                id=2,
-                date=datetime(2025, 1, 15, 14, 31, 0, tzinfo=UTC),
-                sender_id=1002,
-                sender_name="Jane",
-                text="Second",
+            replace(BASE_MSG, sender_name="John", text="First"),
+            replace(
+                BASE_MSG, id=2, date=_DT_15_1431, sender_id=1002, sender_name="Jane", text="Second"
             ),
         ]
 
-        result = await export_messages_to_json(messages, tmp_path)
+        result = await export_messages_to_json(messages, out_dir)
 
-        data = json.loads(result.read_text())
+        data = _load_json(result)
         assert data["message_count"] == 2
 
-    @pytest.mark.asyncio
-    async def test_export_messages_to_json_includes_export_timestamp(
-        self, tmp_path: Path
-    ) -> None:
+    async def test_export_messages_to_json_includes_export_timestamp(self, out_dir: Path) -> None:
         """
         GIVEN messages to export
         WHEN calling export_messages_to_json
         THEN JSON includes exported_at timestamp
         """
-        messages = [
-            Message(
-                id=1,
-                date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John",
-                text="Hello",
-            )
-        ]
+        messages = [BASE_MSG]
 
-        result = await export_messages_to_json(messages, tmp_path)
+        result = await export_messages_to_json(messages, out_dir)
 
-        data = json.loads(result.read_text())
+        data = _load_json(result)
         assert "exported_at" in data
         # Should be ISO format
         assert "T" in data["exported_at"]
 
-    @pytest.mark.asyncio
-    async def test_export_messages_to_json_handles_empty_list(
-        self, tmp_path: Path
-    ) -> None:
+    async def test_export_messages_to_json_handles_empty_list(self, out_dir: Path) -> None:
         """
         GIVEN an empty message list
         WHEN calling export_messages_to_json
@@ -1124,15 +703,14 @@ class TestExportMessagesToJson:
         """
         messages: list[Message] = []
 
-        result = await export_messages_to_json(messages, tmp_path)
+        result = await export_messages_to_json(messages, out_dir)
 
-        data = json.loads(result.read_text())
+        data = _load_json(result)
         assert data["message_count"] == 0
         assert data["messages"] == []
 
-    @pytest.mark.asyncio
     async def test_export_messages_to_json_handles_none_optional_fields(
-        self, tmp_path: Path
+        self, out_dir: Path
     ) -> None:
         """
         GIVEN a message with None optional fields
@@ -1140,67 +718,64 @@ class TestExportMessagesToJson:
         THEN optional fields are null in JSON
         """
         messages = [
-            Message(
-                id=1,
-                date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John",
-                text="Hello",
-                reply_to=None,
-                media_type=None,
-                media_path=None,
-            )
+            replace(BASE_MSG, sender_name="John", reply_to=None, media_type=None, media_path=None)
         ]
 
-        result = await export_messages_to_json(messages, tmp_path)
+        result = await export_messages_to_json(messages, out_dir)
 
-        data = json.loads(result.read_text())
+        data = _load_json(result)
         msg = data["messages"][0]
 
         assert msg["reply_to"] is None
         assert msg["media_type"] is None
         assert msg["media_path"] is None
 
-    @pytest.mark.asyncio
-    async def test_export_messages_to_json_is_valid_json(
-        self, tmp_path: Path
+    @pytest.mark.parametrize("chunk_size", [5000, 1], ids=["single-write", "chunked"])
+    async def test_export_messages_to_json_omit_none_drops_null_fields(
+        self, out_dir: Path, monkeypatch: pytest.MonkeyPatch, chunk_size: int
     ) -> None:
+        """
+        GIVEN a plain text message and a photo message
+        WHEN calling export_messages_to_json with omit_none=True
+        THEN None optional fields are left out and the messages load back unchanged
+        """
+        monkeypatch.setattr("telegram_getter.exporter._JSON_CHUNK_SIZE", chunk_size)
+        messages = [
+            BASE_MSG,
+            replace(BASE_MSG, id=2, date=_DT_15_1431, media_type="photo", media_path="media/a.jpg"),
+        ]
+
+        result = await export_messages_to_json(messages, out_dir, omit_none=True)
+
+        data = _load_json(result)
+        assert data["messages"][0].keys() == {"id", "date", "sender_id", "sender_name", "text"}
+        assert data["messages"][1]["media_path"] == "media/a.jpg"
+        assert "reply_to" not in data["messages"][1]
+        assert [dict_to_message(d) for d in data["messages"]] == messages
+
+    async def test_export_messages_to_json_is_valid_json(self, out_dir: Path) -> None:
         """
         GIVEN messages
         WHEN calling export_messages_to_json
         THEN output file is valid JSON
         """
-        messages = [
-            Message(
-                id=1,
-                date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John Doe",
-                text="Hello",
-            )
-        ]
+        messages = [BASE_MSG]
 
-        result = await export_messages_to_json(messages, tmp_path)
+        result = await export_messages_to_json(messages, out_dir)
 
-        # Should not raise
+        # Should not raise; parsed with stdlib json as a check independent of orjson
         data = json.loads(result.read_text())
         assert isinstance(data, dict)
 
-    @pytest.mark.asyncio
-    async def test_export_messages_to_json_includes_transcription(
-        self, tmp_path: Path
-    ) -> None:
+    async def test_export_messages_to_json_includes_transcription(self, out_dir: Path) -> None:
         """
         GIVEN a message with transcription
         WHEN calling export_messages_to_json
         THEN JSON includes transcription field
         """
         messages = [
-            Message(
-                id=1,
-                date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John Doe",
+            replace(
+                BASE_MSG,
                 text="",
                 media_type="audio",
                 media_path="media/audio/voice.ogg",
@@ -1208,36 +783,26 @@ class TestExportMessagesToJson:
             )
         ]
 
-        result = await export_messages_to_json(messages, tmp_path)
+        result = await export_messages_to_json(messages, out_dir)
 
-        data = json.loads(result.read_text())
+        data = _load_json(result)
         msg = data["messages"][0]
 
         assert msg["transcription"] == "This is the voice transcription"
 
-    @pytest.mark.asyncio
     async def test_export_messages_to_json_transcription_null_when_missing(
-        self, tmp_path: Path
+        self, out_dir: Path
     ) -> None:
         """
         GIVEN a message without transcription
         WHEN calling export_messages_to_json
         THEN transcription field is null in JSON
         """
-        messages = [
-            Message(
-                id=1,
-                date=datetime(2025, 1, 15, 14, 30, 0, tzinfo=UTC),
-                sender_id=1001,
-                sender_name="John Doe",
-                text="Hello",
-                transcription=None,
-            )
-        ]
+        messages = [replace(BASE_MSG, transcription=None)]
 
-        result = await export_messages_to_json(messages, tmp_path)
+        result = await export_messages_to_json(messages, out_dir)
 
-        data = json.loads(result.read_text())
+        data = _load_json(result)
         msg = data["messages"][0]
 
         assert msg["transcription"] is None
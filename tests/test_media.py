@@ -8,8 +8,10 @@ These tests verify:
 4. Proper folder structure creation
 5. Duplicate file handling
 6. Progress callback support
+7. Bounded concurrent downloads with download_all()
 """
 
+import asyncio
 from datetime import UTC, datetime
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock
@@ -21,6 +23,7 @@ from telegram_getter.media import (
     generate_filename,
     get_media_type,
 )
+from tests.helpers import aiter_items
 
 
 class TestGetMediaType:
@@ -618,3 +621,99 @@ class TestMediaDownloaderExtension:
 
         assert result is not None
         assert result.endswith(".pdf")
+
+
+def _photo_message(msg_id: int) -> MagicMock:
+    """Build a photo message dated 2025-01-15 with the given ID."""
+    message = MagicMock()
+    message.media = MagicMock()
+    message.media.__class__.__name__ = "MessageMediaPhoto"
+    message.date = datetime(2025, 1, 15, tzinfo=UTC)
+    message.id = msg_id
+    return message
+
+
+class TestMediaDownloaderDownloadAll:
+    """Test MediaDownloader.download_all method."""
+
+    @pytest.mark.real_sleep
+    @pytest.mark.asyncio
+    async def test_download_all_limits_concurrent_downloads(self, tmp_path: Path) -> None:
+        """
+        GIVEN more media messages than the concurrency limit
+        WHEN calling download_all
+        THEN no more than the limit are in flight and all are downloaded
+        """
+        in_flight = 0
+        peak = 0
+
+        async def mock_download(*_args, **kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            for _ in range(3):
+                await asyncio.sleep(0)
+            in_flight -= 1
+            return kwargs["file"]
+
+        mock_client = MagicMock()
+        mock_client.download_media = mock_download
+        downloader = MediaDownloader(client=mock_client, output_dir=tmp_path)
+
+        count = await downloader.download_all(
+            aiter_items([_photo_message(i) for i in range(10)]), concurrency=3
+        )
+
+        assert count == 10
+        assert 1 < peak <= 3
+
+    @pytest.mark.real_sleep
+    @pytest.mark.asyncio
+    async def test_download_all_reports_paths_in_stream_order(self, tmp_path: Path) -> None:
+        """
+        GIVEN downloads that finish out of order
+        WHEN calling download_all
+        THEN sequence numbers still follow stream order
+        """
+
+        async def mock_download(*_args, **kwargs):
+            # Earlier files take longer, so completion order is reversed
+            await asyncio.sleep(0.001 * (3 - int(kwargs["file"][-7:-4])))
+            return kwargs["file"]
+
+        mock_client = MagicMock()
+        mock_client.download_media = mock_download
+        downloader = MediaDownloader(client=mock_client, output_dir=tmp_path)
+
+        results: dict[int, str] = {}
+        await downloader.download_all(
+            aiter_items([_photo_message(i) for i in (1, 2, 3)]),
+            on_downloaded=lambda msg, path: results.__setitem__(msg.id, path),
+        )
+
+        assert results == {
+            1: "media/images/2025-01-15_001.jpg",
+            2: "media/images/2025-01-15_002.jpg",
+            3: "media/images/2025-01-15_003.jpg",
+        }
+
+    @pytest.mark.asyncio
+    async def test_download_all_skips_failed_downloads(self, tmp_path: Path) -> None:
+        """
+        GIVEN a download that returns None
+        WHEN calling download_all
+        THEN it is not counted or reported
+        """
+        mock_client = MagicMock()
+        mock_client.download_media = AsyncMock(side_effect=[None, "ok"])
+        downloader = MediaDownloader(client=mock_client, output_dir=tmp_path)
+        reported: list[int] = []
+
+        count = await downloader.download_all(
+            aiter_items([_photo_message(1), _photo_message(2)]),
+            on_downloaded=lambda msg, _path: reported.append(msg.id),
+            concurrency=1,
+        )
+
+        assert count == 1
+        assert reported == [2]
@@ -8,7 +8,6 @@ These tests verify:
 4. Timeout handling for long-running transcriptions
 """
 
-import asyncio
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
@@ -318,6 +317,36 @@ class TestTranscribeVoiceMessagePolling:
         assert result == "Finally done"
         assert mock_client.call_count == 4
 
+    @pytest.mark.asyncio
+    async def test_returns_text_ready_on_last_poll(self) -> None:
+        """
+        GIVEN a transcription that completes only at the last poll within max_wait
+        WHEN calling transcribe_voice_message
+        THEN the final status check still runs and its text is returned
+        """
+        from telegram_getter.transcriber import transcribe_voice_message
+
+        pending_result = MagicMock()
+        pending_result.pending = True
+        pending_result.text = None
+
+        complete_result = MagicMock()
+        complete_result.pending = False
+        complete_result.text = "hello"
+
+        # Two polls fit in max_wait; the second one sees the finished result
+        mock_client = AsyncMock(side_effect=[pending_result, pending_result, complete_result])
+
+        result = await transcribe_voice_message(
+            client=mock_client,
+            peer=12345,
+            msg_id=100,
+            max_wait=4,
+        )
+
+        assert result == "hello"
+        assert mock_client.call_count == 3
+
 
 class TestTranscribeVoiceMessageErrorHandling:
     """Test error handling scenarios."""